@@ -0,0 +1,339 @@
+"""
+Headless load generator for the dashboard.
+
+Starts the app against a stubbed News API and drives N simulated analyst sessions over Streamlit's
+websocket protocol. Each session navigates the pages, classifies a report, searches the feed and
+refreshes it. Per-page latency percentiles and server memory growth are reported at the end.
+
+Usage: python loadtest.py --sessions 20 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+WIDGET_TYPES = {'button', 'checkbox', 'text_area', 'text_input'}
+
+SAMPLE_REPORTS = [
+    "Increased military activity observed near the border",
+    "New trade agreement signed, expected to boost exports",
+    "Cybersecurity threats on the rise in financial sector",
+    "Peaceful protests lead to policy changes",
+]
+
+SEARCH_TERMS = ['security', 'trade', 'election', 'energy']
+
+# Each step is (page, widget values). Buttons are triggered by passing True.
+SCENARIO = [
+    ('main', {}),
+    ('ml analysis', {'Intelligence Report': lambda: random.choice(SAMPLE_REPORTS), 'Classify': True}),
+    ('real time intel', {'Search Reports': lambda: random.choice(SEARCH_TERMS)}),
+    ('real time intel', {'Refresh Data': True}),
+]
+
+
+def make_stub_articles(n_articles=50):
+    """
+    Build a News API style payload of synthetic articles.
+    """
+    now = datetime.utcnow()
+    articles = []
+    for i in range(n_articles):
+        term = SEARCH_TERMS[i % len(SEARCH_TERMS)]
+        articles.append({
+            'source': {'id': None, 'name': f"Source {i % 5}"},
+            'title': f"Report {i} on regional {term} developments",
+            'description': f"Synthetic article {i} describing {term} activity.",
+            'publishedAt': (now - timedelta(minutes=15 * i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        })
+    return {'status': 'ok', 'totalResults': n_articles, 'articles': articles}
+
+
+def start_stub_news_api(port):
+    """
+    Serve the synthetic News API payload on localhost in a background thread.
+    """
+    body = json.dumps(make_stub_articles()).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_app(port, news_api_url):
+    """
+    Launch the Streamlit app in a subprocess and wait until it reports healthy.
+    """
+    env = os.environ.copy()
+    env['NEWS_API_URL'] = news_api_url
+    env.setdefault('ASIH_CACHE_DIR', tempfile.mkdtemp(prefix='asih_loadtest_'))
+    command = [sys.executable, '-m', 'streamlit', 'run', 'main.py',
+               '--server.port', str(port), '--server.address', '127.0.0.1', '--server.headless', 'true']
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(120):
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Streamlit app did not become healthy")
+
+
+def get_rss_mb(pid):
+    """
+    Resident memory of a process in MB (Linux only; returns None elsewhere).
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+class SimulatedSession:
+    """
+    One analyst session speaking Streamlit's websocket protocol.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.connection = None
+        self.pages = {}
+        self.widgets = defaultdict(dict)
+        self._message_cache = {}
+        # Exception messages raised by the page script during the last rerun
+        self.exceptions = []
+
+    async def connect(self):
+        self.connection = await websocket_connect(self.url)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    def _page_hash(self, page):
+        for name, page_hash in self.pages.items():
+            if page in name:
+                return page_hash
+        return ''
+
+    def _add_widget_state(self, states, widgets, label, value):
+        kind, widget_id = widgets[label]
+        state = states.add()
+        state.id = widget_id
+        if kind == 'button':
+            state.trigger_value = bool(value)
+        elif kind == 'checkbox':
+            state.bool_value = bool(value)
+        else:
+            state.string_value = value() if callable(value) else value
+
+    async def rerun(self, page, values=None):
+        """
+        Run a page with the given widget values and return the latency until the script finished.
+        Exceptions the script raised (shown as error elements in the page) are left in `exceptions`.
+        """
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self._page_hash(page)
+        msg.rerun_script.page_name = page
+        widgets = self.widgets[page]
+        for label, value in (values or {}).items():
+            if label in widgets:
+                self._add_widget_state(msg.rerun_script.widget_states.widgets, widgets, label, value)
+
+        self.exceptions = []
+        started = time.perf_counter()
+        await self.connection.write_message(msg.SerializeToString(), binary=True)
+        while True:
+            payload = await self.connection.read_message()
+            if payload is None:
+                raise ConnectionError("Websocket closed by server")
+            forward = ForwardMsg()
+            forward.ParseFromString(payload)
+            kind = forward.WhichOneof('type')
+            if kind == 'ref_hash':
+                forward = self._message_cache.get(forward.ref_hash, forward)
+                kind = forward.WhichOneof('type')
+            elif forward.metadata.cacheable:
+                self._message_cache[forward.hash] = forward
+
+            if kind == 'new_session':
+                self.pages = {p.page_name.lower().replace('_', ' '): p.page_script_hash
+                              for p in forward.new_session.app_pages}
+            elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                element = forward.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    widgets[widget.label] = (element_type, widget.id)
+                elif element_type == 'exception':
+                    self.exceptions.append(f"{element.exception.type}: {element.exception.message}")
+            elif kind == 'script_finished' and \
+                    forward.script_finished != ForwardMsg.ScriptFinishedStatus.FINISHED_EARLY_FOR_RERUN:
+                return time.perf_counter() - started
+
+
+async def run_step(session, step, page, values, latencies, script_errors):
+    latency = await session.rerun(page, values)
+    # A step whose script raised is an error, not a successful timing
+    if session.exceptions:
+        script_errors[step].extend(session.exceptions)
+    else:
+        latencies[step].append(latency)
+
+
+async def run_round(session, latencies, script_errors):
+    for page, values in SCENARIO:
+        # Navigate first if the page's widgets have not been seen in this session yet
+        if values and not session.widgets[page]:
+            await run_step(session, f"{page} (navigate)", page, None, latencies, script_errors)
+        action = ', '.join(values) or 'navigate'
+        await run_step(session, f"{page} ({action})", page, values, latencies, script_errors)
+
+
+async def run_session(url, rounds, latencies, script_errors):
+    session = SimulatedSession(url)
+    await session.connect()
+    try:
+        for _ in range(rounds):
+            await run_round(session, latencies, script_errors)
+    finally:
+        session.close()
+
+
+async def run_load_test(url, n_sessions, rounds, pid=None, ramp_up=0.05):
+    """
+    Run `n_sessions` concurrent sessions for `rounds` rounds of the scenario. Memory is sampled
+    after every round, against a baseline taken after a warm-up session, so one-off costs
+    (imports, model training, cache warm-up) are not counted as per-session growth.
+    """
+    def sample():
+        return get_rss_mb(pid) if pid else None
+
+    # Warm-up session, excluded from the latency figures
+    await run_session(url, 1, defaultdict(list), defaultdict(list))
+    await asyncio.sleep(2)
+    memory = [('baseline', sample())]
+
+    latencies = defaultdict(list)
+    script_errors = defaultdict(list)
+    sessions = [SimulatedSession(url) for _ in range(n_sessions)]
+    errors = []
+
+    async def first_round(i, session):
+        await asyncio.sleep(i * ramp_up)
+        await session.connect()
+        await run_round(session, latencies, script_errors)
+
+    active = sessions
+    for round_no in range(rounds):
+        if round_no == 0:
+            results = await asyncio.gather(*(first_round(i, s) for i, s in enumerate(active)), return_exceptions=True)
+        else:
+            results = await asyncio.gather(*(run_round(s, latencies, script_errors) for s in active),
+                                           return_exceptions=True)
+        errors += [r for r in results if isinstance(r, Exception)]
+        active = [s for s, r in zip(active, results) if not isinstance(r, Exception)]
+        memory.append((f"after round {round_no + 1}", sample()))
+
+    for session in sessions:
+        session.close()
+    # Give the server time to drop disconnected sessions before the final sample
+    await asyncio.sleep(5)
+    memory.append(('after disconnect', sample()))
+    return latencies, memory, errors, script_errors
+
+
+def print_report(latencies, memory, errors, script_errors, n_sessions):
+    print(f"\n{'Page (action)':<55}{'n':>6}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for step in list(latencies) + [step for step in script_errors if step not in latencies]:
+        values, n_errors = latencies.get(step, []), len(script_errors.get(step, []))
+        if values:
+            p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+            print(f"{step:<55}{len(values):>6}{n_errors:>8}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+        else:
+            print(f"{step:<55}{0:>6}{n_errors:>8}{'-':>10}{'-':>10}{'-':>10}")
+
+    if memory[0][1] is not None:
+        baseline = memory[0][1]
+        print("\nServer memory (RSS), growth per session over the post-warm-up baseline:")
+        print(f"  {'':<20}{'RSS MB':>10}{'KB/session':>12}{'round delta':>13}")
+        previous = baseline
+        for label, rss in memory:
+            growth = (rss - baseline) / n_sessions * 1024
+            delta = (rss - previous) / n_sessions * 1024
+            print(f"  {label:<20}{rss:>10.1f}{growth:>12.1f}{delta:>13.1f}")
+            previous = rss
+        print("  A round delta that stays positive across rounds points to session state that is never released.")
+
+    if script_errors:
+        print("\nScript exceptions:")
+        for step, messages in script_errors.items():
+            print(f"  {step}: {len(messages)}x, first: {messages[0]}")
+    if errors:
+        print(f"\n{len(errors)} session(s) failed, first error: {errors[0]!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent analyst sessions against the dashboard.")
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--port', type=int, default=8599)
+    parser.add_argument('--stub-port', type=int, default=8598)
+    parser.add_argument('--url', help="Target an already running app instead of starting one")
+    parser.add_argument('--pid', type=int, help="Server PID to sample memory from when using --url")
+    args = parser.parse_args()
+
+    process = None
+    stub = None
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        stub = start_stub_news_api(args.stub_port)
+        process = start_app(args.port, f"http://127.0.0.1:{args.stub_port}/v2/top-headlines")
+        url, pid = f"http://127.0.0.1:{args.port}", process.pid
+
+    stream_url = url.replace('http', 'ws', 1).rstrip('/') + '/_stcore/stream'
+    try:
+        latencies, memory, errors, script_errors = asyncio.run(
+            run_load_test(stream_url, args.sessions, args.rounds, pid))
+        print_report(latencies, memory, errors, script_errors, args.sessions)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if stub is not None:
+            stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import streamlit as st
 from streamlit_extras.colored_header import colored_header
 import networkx as nx
 import plotly.graph_objects as go
+from utils.cache_backend import shared_cache
 
 st.set_page_config(page_title="Bridging the Gap", page_icon="🌉", layout="wide")
 
@@ -18,6 +19,7 @@ strategies to bridge this gap.
 """)
 
 # Create a function to generate a network graph of communication challenges
+@shared_cache(namespace='bridging_the_gap.network_graph')  # Layout is computed once and shared by all workers
 def create_network_graph():
     G = nx.Graph()
     
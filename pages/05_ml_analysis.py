@@ -6,6 +6,10 @@ from sklearn.model_selection import train_test_split
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+from utils.similarity import ReportIndex
+from utils.cache_backend import shared_cache
+from utils.text_processing import tokenize, preprocess_corpus
+from utils.explain import ForestExplainer
 
 st.set_page_config(page_title="ML Analysis", page_icon="🤖", layout="wide")
 
@@ -31,17 +35,37 @@ intelligence_reports = [
 # Prepare data
 reports, classifications = zip(*intelligence_reports)
 
-# Text preprocessing and vectorization
-vectorizer = CountVectorizer(stop_words='english')
-X = vectorizer.fit_transform(reports)
-y = np.array(classifications)
+# Train the model once and share it across sessions and workers
+@shared_cache(namespace='ml_analysis.model')
+def train_model(reports, classifications):
+    # Text preprocessing (shared, cached tokens) and vectorization
+    preprocess_corpus(reports)
+    vectorizer = CountVectorizer(analyzer=tokenize)
+    X = vectorizer.fit_transform(reports)
+    y = np.array(classifications)
 
-# Split the data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Split the data
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# Create and train the model
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
+    # Create and train the model
+    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model.fit(X_train, y_train)
+    return vectorizer, model
+
+# Load (or train) the model once per process instead of unpickling it from the shared cache on every rerun
+@st.cache_resource
+def get_model():
+    return train_model(reports, classifications)
+
+vectorizer, model = get_model()
+
+# Per-prediction explainer; its attribution cache is shared across sessions
+@st.cache_resource
+def get_explainer():
+    vectorizer, model = get_model()
+    return ForestExplainer(model, vectorizer)
+
+explainer = get_explainer()
 
 # Get feature importance
 feature_importance = model.feature_importances_
@@ -64,6 +88,13 @@ st.write("Enter an intelligence report for classification:")
 # Text input for intelligence report
 report = st.text_area("Intelligence Report", height=150)
 
+# Similarity index over the report corpus, shared across sessions and updated incrementally
+@st.cache_resource
+def get_report_index():
+    return ReportIndex(n_probe=4).build(reports)
+
+report_index = get_report_index()
+
 # Classify button
 if st.button("Classify"):
     if report:
@@ -78,9 +109,42 @@ if st.button("Classify"):
         st.write("Probabilities:")
         for cls, prob in zip(model.classes_, probabilities):
             st.write(f"- {cls}: {prob:.2f}")
+
+        # Explain which terms drove this prediction
+        explanation = explainer.explain(report)
+        if explanation['attributions']:
+            # Splits on terms the report lacks are shown as one combined bar, not as reasons
+            attributions = explanation['attributions'] + [("(terms absent from report)", explanation['absent_terms'])]
+            terms, weights = zip(*attributions[::-1])
+            fig_explain = go.Figure(go.Bar(
+                x=weights,
+                y=terms,
+                orientation='h',
+                marker_color=['#2ca02c' if w > 0 else '#d62728' for w in weights]
+            ))
+            fig_explain.update_layout(
+                title=f"Why {prediction}? Contributions of the report's terms to the predicted probability",
+                xaxis_title="Contribution",
+                yaxis_title="Term"
+            )
+            st.plotly_chart(fig_explain)
+        else:
+            st.write(f"No known terms found; the prediction reflects the base rate ({explanation['bias']:.2f}).")
     else:
         st.write("Please enter a report to classify.")
 
+# The similarity index is shared by all analysts, so reports are only added on explicit request
+if st.button("Add to Similarity Index"):
+    if report:
+        before = len(report_index)
+        report_index.add([report])
+        if len(report_index) > before:
+            st.success("Report added to the similarity index.")
+        else:
+            st.info("This report is already indexed.")
+    else:
+        st.write("Please enter a report to add.")
+
 # Feature Importance Visualization
 st.subheader("Feature Importance Analysis")
 
@@ -111,5 +175,45 @@ This analysis helps identify key terms that are most influential in determining
 as a Threat, Opportunity, or Neutral.
 """)
 
+# Batch Explanation
+st.subheader("Batch Explanation")
+
+batch_reports = st.text_area("Reports to explain (one per line)", height=150)
+if st.button("Explain Batch"):
+    batch = [line for line in batch_reports.splitlines() if line.strip()]
+    if batch:
+        explanations = explainer.explain_batch(batch, top_n=5)
+        st.dataframe(pd.DataFrame({
+            'report': batch,
+            'prediction': [e['prediction'] for e in explanations],
+            'top_terms': [', '.join(f"{term} ({weight:+.2f})" for term, weight in e['attributions'])
+                          for e in explanations],
+        }), use_container_width=True)
+    else:
+        st.write("Please enter at least one report.")
+
+# Similar Reports
+st.subheader("Similar Reports")
+
+similar_query = st.text_input("Find reports similar to:")
+if similar_query:
+    for report_id, document, score in report_index.search(similar_query, k=5):
+        st.write(f"- {document} (similarity: {score:.2f})")
+
+# Topic Clustering
+st.subheader("Topic Clusters")
+
+clusters = pd.DataFrame(report_index.clusters())
+st.dataframe(clusters, use_container_width=True)
+
+selected_cluster = st.selectbox("Show reports in cluster", clusters['cluster'])
+for document in report_index.cluster_members(selected_cluster):
+    st.write(f"- {document}")
+
+st.write(f"""
+Reports are embedded with TF-IDF and truncated SVD and grouped into topic clusters. Similarity lookups only 
+scan the clusters closest to the query, so they stay fast as the corpus grows ({len(report_index)} reports indexed).
+""")
+
 if __name__ == "__main__":
     st.write("ML Analysis page loaded successfully.")
@@ -1,22 +1,42 @@
 import streamlit as st
 from streamlit_extras.colored_header import colored_header
+import os
+from collections import Counter
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
 import plotly.express as px
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
+from utils.cache_backend import shared_cache
+from utils.visualizations import create_report_frequency_chart
+from utils.text_processing import preprocess_corpus
+from utils.session_store import get_session_store, current_session_id
+from utils.connectors import get_ingest_service, DROP_DIR_ENV
+from utils.stream_detector import observe_reports
 
 st.set_page_config(page_title="Real-Time Intelligence", page_icon="🔄", layout="wide")
 
+# Maximum number of favorites kept per session
+MAX_FAVORITES = 100
+
+# Maximum number of reports rendered in the live feed
+FEED_LIMIT = 50
+
+# News API endpoint (can be overridden, e.g. to point at a local stub during load tests)
+NEWS_API_URL = os.environ.get('NEWS_API_URL', 'https://newsapi.org/v2/top-headlines')
+
+# Local drop directory for offline ingestion; each subdirectory is named after an INT discipline (e.g. SIGINT/)
+DROP_DIR = os.environ.get(DROP_DIR_ENV, os.path.join('data', 'drops'))
+
 # Function to fetch news data (simulating intelligence reports)
-@st.cache_data(ttl=900)  # Cache for 15 minutes
+@shared_cache(ttl=900, namespace='real_time_intel.news')  # Cache for 15 minutes, shared by all workers
 def fetch_news_data():
     api_key = st.secrets.get('NEWS_API_KEY')
     if not api_key:
         st.warning('NEWS_API_KEY not found in secrets. Please set it up to enable real-time data fetching.')
         return None
-    url = f"https://newsapi.org/v2/top-headlines?category=general&language=en&pageSize=10&apiKey={api_key}"
+    url = f"{NEWS_API_URL}?category=general&language=en&pageSize=10&apiKey={api_key}"
     response = requests.get(url)
     if response.status_code == 200:
         st.session_state.api_calls += 1
@@ -26,11 +46,16 @@ def fetch_news_data():
         st.error("Failed to fetch real-time data. Please check your API key and try again.")
         return None
 
-# Function to create a word cloud
-def create_word_cloud(text):
-    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
+# Function to render a word cloud image (cached so each set of term frequencies is only rendered once)
+@shared_cache(ttl=900, namespace='real_time_intel.word_cloud')
+def render_word_cloud(frequencies):
+    return WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(frequencies).to_array()
+
+# Function to create a word cloud from the preprocessed report texts
+def create_word_cloud(texts):
+    frequencies = Counter(token for tokens in preprocess_corpus(texts) for token in tokens)
     fig, ax = plt.subplots(figsize=(10, 5))
-    ax.imshow(wordcloud, interpolation='bilinear')
+    ax.imshow(render_word_cloud(dict(frequencies)), interpolation='bilinear')
     ax.axis('off')
     return fig
 
@@ -39,10 +64,9 @@ if 'api_calls' not in st.session_state:
     st.session_state.api_calls = 0
 if 'last_update' not in st.session_state:
     st.session_state.last_update = None
-if 'cached_data' not in st.session_state:
-    st.session_state.cached_data = None
-if 'favorites' not in st.session_state:
-    st.session_state.favorites = []
+# Large per-session objects (article payloads, favorites) live in the memory-bounded session store
+session_store = get_session_store()
+session_id = current_session_id()
 
 # Main layout
 st.sidebar.title("Controls")
@@ -50,6 +74,7 @@ dark_mode = st.sidebar.checkbox("Dark Mode")
 if dark_mode:
     st.markdown("<style>body {color: white; background-color: #1E1E1E;}</style>", unsafe_allow_html=True)
 
+data_source = st.sidebar.radio("Data Source", ["News API", "Local Drops"])
 search_term = st.sidebar.text_input("Search Reports")
 
 # Display API call information
@@ -59,7 +84,7 @@ if st.session_state.last_update:
 
 # Manual refresh button
 if st.sidebar.button("Refresh Data"):
-    st.session_state.cached_data = None
+    session_store.delete(session_id, 'cached_data')
     st.experimental_rerun()
 
 colored_header(
@@ -80,17 +105,21 @@ with col2:
 
 # Fetch and display data
 with st.spinner("Fetching real-time intelligence data..."):
-    if st.session_state.cached_data is None:
-        data = fetch_news_data()
-        if data:
-            st.session_state.cached_data = data
+    if data_source == "Local Drops":
+        data = get_ingest_service(st.get_option("server.port")).snapshot()
     else:
-        data = st.session_state.cached_data
+        data = session_store.get(session_id, 'cached_data')
+        if data is None:
+            data = fetch_news_data()
+            if data:
+                session_store.set(session_id, 'cached_data', data)
+                # Feed the dashboard's surge detector; articles already counted are skipped
+                observe_reports(data)
 
 if data:
     df = pd.DataFrame(data)
     df['publishedAt'] = pd.to_datetime(df['publishedAt'])
-    df = df.sort_values('publishedAt', ascending=False)
+    df = df.sort_values('publishedAt', ascending=False).drop_duplicates('title')
 
     # Filter data based on search term
     if search_term:
@@ -98,14 +127,17 @@ if data:
 
     # Display live feed
     with live_feed.container():
-        for _, row in df.iterrows():
+        for _, row in df.head(FEED_LIMIT).iterrows():
             with st.expander(row['title'], expanded=True):
                 st.markdown(f"**Source:** {row['source']['name']}")
+                if 'discipline' in row:
+                    st.markdown(f"**Discipline:** {row['discipline']}")
                 st.markdown(f"**Description:** {row['description']}")
                 st.markdown(f"**Published:** {row['publishedAt'].strftime('%Y-%m-%d %H:%M:%S')}")
                 if st.button("⭐ Favorite", key=row['title']):
-                    if row['title'] not in st.session_state.favorites:
-                        st.session_state.favorites.append(row['title'])
+                    favorites = session_store.get(session_id, 'favorites', [])
+                    if row['title'] not in favorites:
+                        session_store.set(session_id, 'favorites', (favorites + [row['title']])[-MAX_FAVORITES:])
                         st.success("Added to favorites!")
                     else:
                         st.info("Already in favorites!")
@@ -120,18 +152,26 @@ if data:
         fig_sources = px.bar(source_counts, x='source', y='count', title="Top Sources")
         st.plotly_chart(fig_sources, use_container_width=True)
 
-        # Report frequency over time
-        fig_timeline = px.line(df.groupby(df['publishedAt'].dt.date).size().reset_index(name='count'), 
-                               x='publishedAt', y='count', title="Report Frequency")
+        # Report frequency over time, downsampled to the selected range so the payload stays bounded
+        report_counts = df.groupby(df['publishedAt'].dt.date).size().reset_index(name='count')
+        timeline_range = None
+        if len(report_counts) > 1:
+            first_day, last_day = report_counts['publishedAt'].min(), report_counts['publishedAt'].max()
+            timeline_range = st.slider("Timeline Range", min_value=first_day, max_value=last_day,
+                                       value=(first_day, last_day))
+        fig_timeline = create_report_frequency_chart(report_counts, x='publishedAt', max_points=500,
+                                                     x_range=timeline_range)
         st.plotly_chart(fig_timeline, use_container_width=True)
 
         # Word cloud
         if len(df) > 0:
-            word_cloud_text = ' '.join(df['title'])
-            st.pyplot(create_word_cloud(word_cloud_text))
+            st.pyplot(create_word_cloud(df['title']))
 
 else:
-    st.write("No data available. Please check your API connection and ensure the API key is set up correctly.")
+    if data_source == "Local Drops":
+        st.write(f"No reports ingested yet. Drop RSS/Atom or JSONL files into `{DROP_DIR}`.")
+    else:
+        st.write("No data available. Please check your API connection and ensure the API key is set up correctly.")
 
 # Display warning when approaching API limit
 if st.session_state.api_calls > 90:  # Assuming a limit of 100 calls per day
@@ -139,7 +179,7 @@ if st.session_state.api_calls > 90:  # Assuming a limit of 100 calls per day
 
 # Display favorites
 st.sidebar.subheader("Favorites")
-for favorite in st.session_state.favorites:
+for favorite in session_store.get(session_id, 'favorites', []):
     st.sidebar.write(favorite)
 
 if __name__ == "__main__":
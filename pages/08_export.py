@@ -0,0 +1,100 @@
+import os
+import streamlit as st
+from streamlit_extras.colored_header import colored_header
+from utils.data_generator import (generate_sample_intelligence_data, get_source_distribution,
+                                  get_confidence_by_source, get_importance_by_region)
+from utils.visualizations import (create_source_distribution_chart, create_confidence_radar_chart,
+                                  create_importance_heatmap, create_intelligence_network,
+                                  create_report_frequency_chart)
+from utils.export import get_export_service, REPORT_FORMATS
+
+st.set_page_config(page_title="Export", page_icon="📦", layout="wide")
+
+# Files larger than this are not offered as in-browser downloads; their path on the server is shown instead
+MAX_DOWNLOAD_BYTES = 50 * 1024 * 1024
+
+colored_header(
+    label="Bulk Export",
+    description="Export reports, aggregate tables and figures",
+    color_name="blue-70"
+)
+
+@st.cache_data
+def load_reports(n_reports):
+    return generate_sample_intelligence_data(n_reports, freq='min')
+
+export_service = get_export_service()
+if 'export_jobs' not in st.session_state:
+    st.session_state.export_jobs = []
+
+# Report selection
+st.sidebar.title("Report Filters")
+n_reports = st.sidebar.select_slider("Reports", options=[1000, 10000, 100000, 1000000], value=10000)
+reports = load_reports(n_reports)
+selected_sources = st.sidebar.multiselect("Sources", sorted(reports['source'].unique()), default=sorted(reports['source'].unique()))
+selected_regions = st.sidebar.multiselect("Regions", sorted(reports['region'].unique()), default=sorted(reports['region'].unique()))
+importance_range = st.sidebar.slider("Importance", min_value=1, max_value=10, value=(1, 10))
+
+filters = {'source': selected_sources, 'region': selected_regions, 'importance': importance_range}
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    st.subheader("Reports")
+    report_format = st.selectbox("Format", REPORT_FORMATS)
+    if st.button("Export Reports"):
+        # Filters are applied chunk by chunk in the background, so the filtered set is never materialized here
+        job_id = export_service.submit_reports(reports, report_format, filters)
+        st.session_state.export_jobs.append(job_id)
+
+with col2:
+    st.subheader("Aggregates")
+    aggregate_format = st.selectbox("Format", REPORT_FORMATS, key='aggregate_format')
+    if st.button("Export Aggregates"):
+        job_id = export_service.submit_aggregates(reports, aggregate_format)
+        st.session_state.export_jobs.append(job_id)
+
+with col3:
+    st.subheader("Figures")
+    figure_format = st.selectbox("Format", ['png', 'svg', 'pdf', 'html'])
+    if figure_format != 'html':
+        st.caption("Static image formats require the `kaleido` package.")
+    if st.button("Render Figures"):
+        data = reports.copy()
+        report_counts = data.groupby(data['date'].dt.date).size().reset_index(name='count')
+        figures = {
+            'source_distribution': create_source_distribution_chart(get_source_distribution(data)),
+            'confidence_by_source': create_confidence_radar_chart(get_confidence_by_source(data)),
+            'importance_by_region': create_importance_heatmap(get_importance_by_region(data)),
+            'intelligence_network': create_intelligence_network(),
+            'report_frequency': create_report_frequency_chart(report_counts),
+        }
+        job_id = export_service.submit_figures(figures, figure_format)
+        st.session_state.export_jobs.append(job_id)
+
+# Export jobs for this session
+st.subheader("Export Jobs")
+st.button("Refresh Status")
+
+# Jobs pruned by the service are forgotten here too
+st.session_state.export_jobs = [job_id for job_id in st.session_state.export_jobs
+                                 if export_service.job(job_id) is not None]
+jobs = [export_service.job(job_id) for job_id in reversed(st.session_state.export_jobs)]
+if not jobs:
+    st.write("No exports yet.")
+
+for job in jobs:
+    with st.expander(f"{job['description']}: {job['status']}", expanded=job['status'] != 'done'):
+        if job['error']:
+            st.error(job['error'])
+        for path in job['paths']:
+            size = os.path.getsize(path)
+            if size <= MAX_DOWNLOAD_BYTES:
+                with open(path, 'rb') as f:
+                    st.download_button(f"Download {os.path.basename(path)} ({size / 1024:.1f} KB)", f,
+                                       file_name=os.path.basename(path), key=path)
+            else:
+                st.write(f"{path} ({size / 1024 / 1024:.1f} MB)")
+
+if __name__ == "__main__":
+    st.write("Export page loaded successfully.")
@@ -0,0 +1,123 @@
+"""
+Run the dashboard as several Streamlit worker processes behind a local TCP load balancer.
+
+Workers share one cache backend (see utils/cache_backend.py), so fetched articles, trained models
+and rendered figures are computed once and reused by every worker.
+
+Usage: python serve.py --workers 4 --port 5000
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import signal
+import subprocess
+import sys
+
+from utils.cache_backend import CACHE_BACKEND_ENV, CACHE_DIR_ENV
+
+
+class LoadBalancer:
+    """
+    TCP proxy with client affinity. Every connection from one client address goes to the same
+    worker, chosen by hashing the address. This matters because Streamlit serves media (plots,
+    download buttons) from the memory of the worker that ran the script, so the browser's plain
+    HTTP requests for them must reach the same worker as its websocket. If that worker is down,
+    the least loaded one is used instead.
+
+    Clients behind one NAT or proxy share an address and therefore a worker.
+    """
+
+    def __init__(self, worker_ports, host='127.0.0.1'):
+        self.worker_ports = worker_ports
+        self.host = host
+        self.active = {port: 0 for port in worker_ports}
+
+    async def _pipe(self, reader, writer):
+        try:
+            while data := await reader.read(65536):
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _candidates(self, client_host):
+        digest = hashlib.sha1(str(client_host).encode()).digest()
+        preferred = self.worker_ports[int.from_bytes(digest[:8], 'big') % len(self.worker_ports)]
+        # Fall back from least to most loaded so a worker that is still starting is skipped
+        others = sorted((port for port in self.worker_ports if port != preferred), key=self.active.get)
+        return [preferred] + others
+
+    async def handle(self, client_reader, client_writer):
+        peer = client_writer.get_extra_info('peername')
+        for port in self._candidates(peer[0] if peer else None):
+            try:
+                worker_reader, worker_writer = await asyncio.open_connection(self.host, port)
+            except OSError:
+                continue
+            self.active[port] += 1
+            try:
+                await asyncio.gather(self._pipe(client_reader, worker_writer),
+                                     self._pipe(worker_reader, client_writer))
+            finally:
+                self.active[port] -= 1
+            return
+        client_writer.close()
+
+    async def serve(self, address, port):
+        server = await asyncio.start_server(self.handle, address, port)
+        async with server:
+            await server.serve_forever()
+
+
+def start_workers(n_workers, base_port, env):
+    """
+    Launch `n_workers` headless Streamlit processes on consecutive ports after `base_port`.
+    """
+    workers = []
+    for i in range(n_workers):
+        port = base_port + i + 1
+        command = [sys.executable, '-m', 'streamlit', 'run', 'main.py',
+                   '--server.port', str(port), '--server.address', '127.0.0.1',
+                   '--server.headless', 'true']
+        workers.append((port, subprocess.Popen(command, env=env)))
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the dashboard with multiple worker processes.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--address', default='0.0.0.0')
+    parser.add_argument('--cache-dir', help="Shared disk cache directory (default: a private per-user temp directory)")
+    args = parser.parse_args()
+
+    env = os.environ.copy()
+    env.setdefault(CACHE_BACKEND_ENV, 'disk')
+    if args.cache_dir:
+        env.setdefault(CACHE_DIR_ENV, args.cache_dir)
+
+    workers = start_workers(args.workers, args.port, env)
+
+    def handle_sigterm(*_):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    balancer = LoadBalancer([port for port, _ in workers])
+    print(f"Serving {args.workers} workers on http://{args.address}:{args.port}")
+    try:
+        asyncio.run(balancer.serve(args.address, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        for _, process in workers:
+            process.terminate()
+        for _, process in workers:
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+import functools
+import hashlib
+import os
+import pickle
+import stat
+import struct
+import tempfile
+import threading
+import time
+
+# Backend selection is driven by the environment so every worker process picks up the same store
+CACHE_BACKEND_ENV = 'ASIH_CACHE_BACKEND'
+CACHE_DIR_ENV = 'ASIH_CACHE_DIR'
+CACHE_MAX_BYTES_ENV = 'ASIH_CACHE_MAX_BYTES'
+REDIS_URL_ENV = 'ASIH_REDIS_URL'
+
+
+def default_private_dir(name):
+    """
+    Per-user default location under the system temp directory, e.g. /tmp/asih_cache_1000.
+    """
+    suffix = f"_{os.getuid()}" if hasattr(os, 'getuid') else ''
+    return os.path.join(tempfile.gettempdir(), name + suffix)
+
+
+def ensure_private_dir(path):
+    """
+    Create `path` with 0700 permissions if needed and check that it is a real directory owned by
+    the current user that nobody else can write to. Cache and spill files are unpickled, so a
+    directory others can write to would let them run code in the app.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, 'getuid'):
+        info = os.lstat(path)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o022:
+            raise PermissionError(f"{path} must be a directory owned by the current user and not writable "
+                                  f"by group or others (e.g. chmod 700 {path})")
+    return path
+
+
+class CacheBackend:
+    """
+    Minimal key/value interface shared by all cache backends. Values are stored as pickled bytes.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process cache. Only suitable for a single worker.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            return payload
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    Shared cache stored as files in a local directory, so several worker processes on one host
+    see the same entries. Writes go to a temporary file and are renamed into place atomically.
+
+    Each file starts with a small header holding its expiry time, so a periodic sweep (at most
+    every `sweep_interval` seconds, triggered by writes) can drop expired entries without
+    unpickling them. The sweep then removes the least recently used entries until the directory
+    fits in `max_bytes`.
+
+    Entries are unpickled, so the directory must be private to the app's user: it is created with
+    0700 permissions and rejected if someone else owns it or can write to it.
+    """
+
+    MAGIC = b'ASIH1'
+    HEADER = struct.Struct('<d')
+
+    def __init__(self, directory=None, max_bytes=512 * 1024 * 1024, sweep_interval=60):
+        self.directory = ensure_private_dir(directory or default_private_dir('asih_cache'))
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def _read_header(self, f):
+        header = f.read(len(self.MAGIC) + self.HEADER.size)
+        if not header.startswith(self.MAGIC) or len(header) < len(self.MAGIC) + self.HEADER.size:
+            return None
+        return self.HEADER.unpack_from(header, len(self.MAGIC))[0]
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at = self._read_header(f)
+                if expires_at is None or (expires_at and expires_at < time.time()):
+                    payload = None
+                else:
+                    payload = f.read()
+        except FileNotFoundError:
+            return None
+        if payload is None:
+            self.delete(key)
+            return None
+        # Touch the file so the size cap evicts least recently used entries first
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return payload
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else 0.0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.MAGIC + self.HEADER.pack(expires_at))
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+        self._maybe_sweep()
+
+    def _maybe_sweep(self):
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = now
+        self.sweep(now)
+
+    def sweep(self, now=None):
+        """
+        Remove expired entries, then the least recently used ones until the cache fits in
+        `max_bytes`. Returns the number of files removed.
+        """
+        now = now or time.time()
+        removed = 0
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+                if name.startswith('.tmp'):
+                    # Leftover from a writer that died mid-write
+                    expired = now - stat.st_mtime > 3600
+                else:
+                    with open(path, 'rb') as f:
+                        expires_at = self._read_header(f)
+                    expired = expires_at is None or (expires_at and expires_at < now)
+                if expired:
+                    os.remove(path)
+                    removed += 1
+                elif not name.startswith('.tmp'):
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            except FileNotFoundError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache backed by a Redis (or Redis-compatible) server. Requires the optional `redis` package.
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='asih:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_cache_backend():
+    """
+    Return the process-wide cache backend configured through ASIH_CACHE_BACKEND
+    ('disk' by default, 'memory' or 'redis').
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            kind = os.environ.get(CACHE_BACKEND_ENV, 'disk').lower()
+            if kind == 'memory':
+                _backend = MemoryCacheBackend()
+            elif kind == 'redis':
+                _backend = RedisCacheBackend(os.environ.get(REDIS_URL_ENV, 'redis://localhost:6379/0'))
+            elif kind == 'disk':
+                max_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV, 512 * 1024 * 1024))
+                _backend = DiskCacheBackend(os.environ.get(CACHE_DIR_ENV), max_bytes=max_bytes)
+            else:
+                raise ValueError(f"Unknown cache backend: {kind}")
+        return _backend
+
+
+def set_cache_backend(backend):
+    """
+    Override the process-wide cache backend.
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def make_cache_key(namespace, *args, **kwargs):
+    """
+    Build a stable cache key from a namespace and the pickled call arguments.
+    """
+    digest = hashlib.sha256(pickle.dumps((args, sorted(kwargs.items())), protocol=4)).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+def shared_cache(ttl=None, namespace=None):
+    """
+    Decorator that memoises a function's return value in the shared cache backend.
+
+    Unlike `st.cache_data`, entries are visible to every worker process using the same backend.
+    `None` results are not cached so that failed fetches are retried.
+    """
+    def decorator(func):
+        key_namespace = namespace or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            backend = get_cache_backend()
+            key = make_cache_key(key_namespace, *args, **kwargs)
+            payload = backend.get(key)
+            if payload is not None:
+                return pickle.loads(payload)
+            result = func(*args, **kwargs)
+            if result is not None:
+                backend.set(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), ttl=ttl)
+            return result
+
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    # Test the shared cache decorator against the in-memory backend
+    set_cache_backend(MemoryCacheBackend())
+    calls = []
+
+    @shared_cache(ttl=60)
+    def slow_square(x):
+        calls.append(x)
+        return x * x
+
+    print("First call:", slow_square(4))
+    print("Second call:", slow_square(4))
+    print("Underlying calls:", len(calls))
+
+    # Test expiry and the size cap of the disk backend
+    disk = DiskCacheBackend(tempfile.mkdtemp(prefix='asih_cache_test_'), max_bytes=3000)
+    disk.set('expired', b'x' * 100, ttl=-1)
+    for i in range(5):
+        disk.set(f"entry{i}", bytes(1000))
+    disk.get('entry0')
+    print("Removed by sweep:", disk.sweep())
+    print("Remaining:", sorted(key for key in ['expired'] + [f"entry{i}" for i in range(5)] if disk.get(key)))
@@ -0,0 +1,516 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+CHECKPOINT_DIR_ENV = 'ASIH_CHECKPOINT_DIR'
+DROP_DIR_ENV = 'ASIH_DROP_DIR'
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+logger = logging.getLogger(__name__)
+
+
+def make_report(title, description, source, discipline, published=None, url=None, report_id=None,
+                region=None, importance=None):
+    """
+    Build a report in the common connector schema, which matches the News API article shape
+    used by the real-time page (plus the INT discipline it came from and, when known, its region
+    and importance).
+    """
+    published = published or datetime.now(timezone.utc)
+    return {
+        'id': report_id or hashlib.sha1(f"{source}|{title}|{url}".encode()).hexdigest(),
+        'title': title or '',
+        'description': description or '',
+        'source': {'id': None, 'name': source},
+        'discipline': discipline,
+        'publishedAt': published.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'url': url,
+        'region': region,
+        'importance': importance,
+    }
+
+
+def _parse_date(text):
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        return parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        pass
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+class CheckpointStore:
+    """
+    Persists each connector's progress as a small JSON file so ingestion resumes where it left off.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.environ.get(CHECKPOINT_DIR_ENV) or \
+            os.path.join(tempfile.gettempdir(), 'asih_checkpoints')
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, hashlib.sha1(name.encode()).hexdigest() + '.json')
+
+    def load(self, name, default=None):
+        try:
+            with open(self._path(name)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return default
+
+    def save(self, name, state):
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self._path(name))
+
+
+class Commit:
+    """
+    Persists one connector checkpoint state when called.
+    """
+
+    def __init__(self, checkpoints, key, state):
+        self.checkpoints = checkpoints
+        self.key = key
+        self.state = state
+
+    def __call__(self):
+        self.checkpoints.save(self.key, self.state)
+
+
+async def _iterate_in_thread(iterator, batch_size=500):
+    """
+    Drive a blocking iterator from a worker thread in batches, yielding to the event loop between them.
+    """
+    sentinel = object()
+
+    def next_batch():
+        batch = []
+        for item in iterator:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                break
+        return batch or sentinel
+
+    while True:
+        batch = await asyncio.to_thread(next_batch)
+        if batch is sentinel:
+            return
+        for item in batch:
+            yield item
+
+
+class SourceConnector:
+    """
+    Base class for ingestion connectors.
+
+    `stream()` is an async iterator of (report, commit) pairs. `commit` is a `Commit` that persists
+    the connector's checkpoint up to and including that report (the report may be None for a
+    checkpoint-only update). The scheduler calls it only after
+    the report has been handed to the sink, so delivery is at-least-once across restarts.
+
+    Subclasses must implement `stream` as an async generator; defining one without it raises
+    TypeError.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.stream is SourceConnector.stream:
+            raise TypeError(f"{cls.__name__} must implement stream()")
+
+    def __init__(self, name, discipline='OSINT', checkpoints=None):
+        self.name = name
+        self.discipline = discipline
+        self.checkpoints = checkpoints or CheckpointStore()
+
+    def _commit(self, state):
+        return Commit(self.checkpoints, self.name, state)
+
+    def stream(self):
+        """
+        Async generator of (report, commit) pairs; implemented by every subclass.
+        """
+        raise NotImplementedError
+
+
+class JSONLConnector(SourceConnector):
+    """
+    Reads reports from a JSON-lines drop file. The checkpoint is the byte offset already consumed,
+    so lines appended later are picked up on the next run. A truncated file is re-read from the start.
+    """
+
+    def __init__(self, path, discipline='OSINT', name=None, checkpoints=None):
+        super().__init__(name or f"jsonl:{os.path.abspath(path)}", discipline, checkpoints)
+        self.path = path
+
+    def _read_lines(self, offset):
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                line = f.readline()
+                # Stop at a partial last line; it is read again once the writer finishes it
+                if not line or not line.endswith(b'\n'):
+                    return
+                offset += len(line)
+                yield line, offset
+
+    async def stream(self):
+        state = self.checkpoints.load(self.name, {'offset': 0})
+        offset = state['offset']
+        if not os.path.exists(self.path):
+            return
+        if os.path.getsize(self.path) < offset:
+            offset = 0
+
+        async for line, offset in _iterate_in_thread(self._read_lines(offset)):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            source = record.get('source')
+            yield make_report(
+                record.get('title'),
+                record.get('description'),
+                source.get('name') if isinstance(source, dict) else source or os.path.basename(self.path),
+                record.get('discipline', self.discipline),
+                _parse_date(record.get('publishedAt') or record.get('published')),
+                record.get('url'),
+                record.get('id'),
+                record.get('region'),
+                record.get('importance'),
+            ), self._commit({'offset': offset})
+
+
+class RSSFileConnector(SourceConnector):
+    """
+    Reads items from a local RSS 2.0 or Atom file, parsed incrementally so large feeds are not
+    loaded whole. The checkpoint records the file's size and modification time and the ids already
+    seen, so an unchanged file is skipped and a rewritten feed only yields new items.
+    """
+
+    def __init__(self, path, discipline='OSINT', name=None, checkpoints=None, max_seen=5000):
+        super().__init__(name or f"rss:{os.path.abspath(path)}", discipline, checkpoints)
+        self.path = path
+        self.max_seen = max_seen
+
+    def _signature(self):
+        stat = os.stat(self.path)
+        return [stat.st_size, stat.st_mtime]
+
+    def _iter_items(self):
+        feed_title = os.path.basename(self.path)
+        for _, element in ET.iterparse(self.path, events=('end',)):
+            tag = element.tag
+            if tag in ('title', ATOM + 'title') and feed_title == os.path.basename(self.path):
+                # The first title closed outside an item is the channel/feed title
+                feed_title = (element.text or feed_title).strip()
+            elif tag == 'item':
+                yield make_report(
+                    element.findtext('title'),
+                    element.findtext('description'),
+                    feed_title,
+                    self.discipline,
+                    _parse_date(element.findtext('pubDate')),
+                    element.findtext('link'),
+                    element.findtext('guid'),
+                )
+                element.clear()
+            elif tag == ATOM + 'entry':
+                link = element.find(ATOM + 'link')
+                yield make_report(
+                    element.findtext(ATOM + 'title'),
+                    element.findtext(ATOM + 'summary') or element.findtext(ATOM + 'content'),
+                    feed_title,
+                    self.discipline,
+                    _parse_date(element.findtext(ATOM + 'published') or element.findtext(ATOM + 'updated')),
+                    link.get('href') if link is not None else None,
+                    element.findtext(ATOM + 'id'),
+                )
+                element.clear()
+
+    async def stream(self):
+        if not os.path.exists(self.path):
+            return
+        state = self.checkpoints.load(self.name, {'signature': None, 'seen': []})
+        signature = self._signature()
+        if state['signature'] == signature:
+            return
+
+        seen = deque(state['seen'], maxlen=self.max_seen)
+        seen_set = set(seen)
+        async for report in _iterate_in_thread(self._iter_items()):
+            if report['id'] in seen_set:
+                continue
+            seen.append(report['id'])
+            seen_set.add(report['id'])
+            yield report, self._commit({'signature': None, 'seen': list(seen)})
+        # Only mark the file as fully processed once every item has been yielded
+        yield None, self._commit({'signature': signature, 'seen': list(seen)})
+
+
+class DirectoryWatcherConnector(SourceConnector):
+    """
+    Watches a drop directory and ingests every *.jsonl, *.rss, *.atom and *.xml file in it,
+    delegating to the file connectors above (each keeps its own checkpoint). With `follow`, the
+    directory is polled every `poll_interval` seconds for new or grown files.
+
+    With `subdirectory_disciplines`, files in each subdirectory are tagged with that subdirectory's
+    name as their INT discipline (e.g. sigint/ -> SIGINT). Subdirectories are listed on every poll,
+    so ones created later are picked up too.
+
+    A file that cannot be read (half-written, or removed mid-poll) is logged and skipped; it is
+    retried on the next poll and does not stop the other files.
+    """
+
+    FILE_CONNECTORS = {'.jsonl': JSONLConnector, '.rss': RSSFileConnector,
+                       '.atom': RSSFileConnector, '.xml': RSSFileConnector}
+
+    def __init__(self, directory, discipline='OSINT', follow=False, poll_interval=5.0, name=None, checkpoints=None,
+                 subdirectory_disciplines=False):
+        super().__init__(name or f"dir:{os.path.abspath(directory)}", discipline, checkpoints)
+        self.directory = directory
+        self.follow = follow
+        self.poll_interval = poll_interval
+        self.subdirectory_disciplines = subdirectory_disciplines
+        self._connectors = {}
+
+    def _file_connector(self, path, discipline=None):
+        connector = self._connectors.get(path)
+        if connector is None:
+            connector_class = self.FILE_CONNECTORS[os.path.splitext(path)[1].lower()]
+            connector = self._connectors[path] = connector_class(path, discipline or self.discipline,
+                                                                 checkpoints=self.checkpoints)
+        return connector
+
+    def _list_files(self):
+        # (path, discipline) pairs for the drop directory and, optionally, its discipline subdirectories
+        directories = [(self.directory, self.discipline)]
+        files = []
+        while directories:
+            directory, discipline = directories.pop(0)
+            try:
+                names = sorted(os.listdir(directory))
+            except OSError:
+                continue
+            for name in names:
+                path = os.path.join(directory, name)
+                if os.path.splitext(name)[1].lower() in self.FILE_CONNECTORS and os.path.isfile(path):
+                    files.append((path, discipline))
+                elif directory == self.directory and self.subdirectory_disciplines and os.path.isdir(path):
+                    directories.append((path, name.upper()))
+        return files
+
+    async def stream(self):
+        while True:
+            for path, discipline in self._list_files():
+                try:
+                    async for item in self._file_connector(path, discipline).stream():
+                        yield item
+                except Exception:
+                    logger.warning("Skipping %s until the next poll", path, exc_info=True)
+            if not self.follow:
+                return
+            await asyncio.sleep(self.poll_interval)
+
+
+class ConnectorScheduler:
+    """
+    Runs connectors concurrently and feeds their reports to a sink in batches.
+
+    Connectors push into a bounded queue, so a slow sink applies backpressure to every producer
+    instead of letting reports pile up in memory. After each batch is delivered, the latest
+    checkpoint of every connector in the batch is committed.
+
+    A connector whose stream fails is logged and restarted from its last committed checkpoint,
+    with exponential backoff starting at `restart_delay` seconds. It is given up after
+    `max_restarts` consecutive failures without producing anything.
+    """
+
+    def __init__(self, connectors, sink, max_queue=1000, batch_size=100, flush_interval=1.0,
+                 restart_delay=1.0, max_restarts=5):
+        self.connectors = connectors
+        self.sink = sink
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.restart_delay = restart_delay
+        self.max_restarts = max_restarts
+        self.stats = {'reports': 0, 'batches': 0, 'errors': 0, 'restarts': 0}
+
+    async def _produce(self, connector, queue):
+        failures = 0
+        while True:
+            try:
+                async for report, commit in connector.stream():
+                    failures = 0
+                    await queue.put((report, commit))
+                return
+            except Exception:
+                self.stats['errors'] += 1
+                failures += 1
+                if failures > self.max_restarts:
+                    logger.error("Connector %s failed %d times in a row; giving up", connector.name, failures,
+                                 exc_info=True)
+                    return
+                delay = self.restart_delay * 2 ** (failures - 1)
+                logger.warning("Connector %s failed; restarting in %.0fs", connector.name, delay, exc_info=True)
+                self.stats['restarts'] += 1
+                await asyncio.sleep(delay)
+
+    async def _deliver(self, batch):
+        reports = [report for report, _ in batch if report is not None]
+        if reports:
+            result = self.sink(reports)
+            if asyncio.iscoroutine(result):
+                await result
+            self.stats['reports'] += len(reports)
+            self.stats['batches'] += 1
+        # Keyed by checkpoint, since one connector (e.g. a directory watcher) may own several
+        commits = {}
+        for _, commit in batch:
+            commits[commit.key] = commit
+        for commit in commits.values():
+            commit()
+
+    async def run(self):
+        """
+        Run until every connector is exhausted (connectors that follow their source run forever).
+        """
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        producers = [asyncio.create_task(self._produce(connector, queue)) for connector in self.connectors]
+        done = asyncio.gather(*producers)
+
+        batch = []
+        while not (done.done() and queue.empty()):
+            if queue.empty():
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=self.flush_interval))
+                except asyncio.TimeoutError:
+                    pass
+            # Drain whatever is already queued without a wait per report
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch and (len(batch) >= self.batch_size or queue.empty()):
+                await self._deliver(batch)
+                batch = []
+        if batch:
+            await self._deliver(batch)
+        await done
+        return self.stats
+
+
+class IngestService:
+    """
+    Runs a scheduler over the given connectors in a background thread and keeps the most recent
+    `max_reports` reports in memory for the dashboard to read. Each delivered batch is also passed
+    to every callback in `on_reports`.
+    """
+
+    def __init__(self, connectors, max_reports=1000, on_reports=()):
+        self.reports = deque(maxlen=max_reports)
+        self.on_reports = list(on_reports)
+        self._lock = threading.Lock()
+        self.scheduler = ConnectorScheduler(connectors, self._sink)
+        self.started = time.time()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.scheduler.run()), daemon=True)
+        self._thread.start()
+
+    def _sink(self, reports):
+        with self._lock:
+            self.reports.extend(reports)
+        for callback in self.on_reports:
+            try:
+                callback(reports)
+            except Exception:
+                logger.exception("Report callback %r failed", callback)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.reports)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_ingest_service(worker_id='default'):
+    """
+    Return the process-wide ingest service watching the drop directory (ASIH_DROP_DIR, default
+    data/drops) and its discipline subdirectories.
+
+    Every worker process ingests the whole drop directory itself, so each worker's feed is
+    complete. Checkpoints are kept per worker under ASIH_CHECKPOINT_DIR/worker_<worker_id>, since
+    sharing one checkpoint directory would make workers split the reports between them. Pass an id
+    that is stable across restarts (the dashboard uses its server port) so a restarted worker
+    resumes where it left off instead of replaying every drop into the surge detector.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            from utils.stream_detector import observe_reports
+
+            checkpoint_dir = os.path.join(os.environ.get(CHECKPOINT_DIR_ENV) or
+                                          os.path.join(tempfile.gettempdir(), 'asih_checkpoints'),
+                                          f"worker_{worker_id}")
+            connector = DirectoryWatcherConnector(os.environ.get(DROP_DIR_ENV, os.path.join('data', 'drops')),
+                                                  follow=True, checkpoints=CheckpointStore(checkpoint_dir),
+                                                  subdirectory_disciplines=True)
+            # Ingested reports also drive the dashboard's surge detector
+            _service = IngestService([connector], on_reports=[observe_reports])
+        return _service
+
+
+if __name__ == "__main__":
+    # Test JSONL and RSS ingestion with checkpointing
+    drop_dir = tempfile.mkdtemp(prefix='asih_drops_')
+    checkpoints = CheckpointStore(tempfile.mkdtemp(prefix='asih_checkpoints_'))
+    with open(os.path.join(drop_dir, 'humint.jsonl'), 'w') as f:
+        for i in range(250):
+            f.write(json.dumps({'title': f"Field report {i}", 'source': 'Station A', 'discipline': 'HUMINT'}) + '\n')
+    with open(os.path.join(drop_dir, 'osint.rss'), 'w') as f:
+        f.write("<rss><channel><title>Open Feed</title>"
+                "<item><title>Port activity increases</title><guid>1</guid>"
+                "<pubDate>Mon, 02 Jan 2023 10:00:00 GMT</pubDate></item>"
+                "<item><title>Election results announced</title><guid>2</guid></item>"
+                "</channel></rss>")
+
+    received = []
+    connector = DirectoryWatcherConnector(drop_dir, checkpoints=checkpoints)
+    print("First run:", asyncio.run(ConnectorScheduler([connector], received.extend).run()))
+    print("Sample:", received[0]['title'], received[0]['discipline'], '|', received[-1]['source']['name'])
+    print("Second run:", asyncio.run(ConnectorScheduler([connector], received.extend).run()))
+
+    # A half-written feed is skipped without stopping the rest of the directory
+    with open(os.path.join(drop_dir, 'a_partial.xml'), 'w') as f:
+        f.write("<rss><channel><item><title>Cut off")
+    os.makedirs(os.path.join(drop_dir, 'sigint'))
+    with open(os.path.join(drop_dir, 'sigint', 'intercepts.jsonl'), 'w') as f:
+        f.write(json.dumps({'title': "Encrypted traffic spike"}) + '\n')
+    with open(os.path.join(drop_dir, 'humint.jsonl'), 'a') as f:
+        f.write(json.dumps({'title': "Late field report"}) + '\n')
+    received = []
+    connector = DirectoryWatcherConnector(drop_dir, checkpoints=checkpoints, subdirectory_disciplines=True)
+    print("With a partial file:", asyncio.run(ConnectorScheduler([connector], received.extend).run()))
+    print("Ingested:", [(report['title'], report['discipline']) for report in received])
@@ -1,9 +1,20 @@
 import pandas as pd
 import numpy as np
 
-def generate_sample_intelligence_data(n_samples=100):
+# Approximate centre (latitude, longitude) and spread in degrees of each region
+REGION_CENTERS = {
+    'North America': (40.0, -100.0, 12.0),
+    'South America': (-15.0, -60.0, 12.0),
+    'Europe': (50.0, 10.0, 7.0),
+    'Africa': (5.0, 20.0, 14.0),
+    'Asia': (35.0, 100.0, 15.0),
+    'Middle East': (29.0, 45.0, 6.0)
+}
+
+def generate_sample_intelligence_data(n_samples=100, with_coordinates=False, freq='D'):
     """
     Generate a sample dataset of intelligence reports for demonstration purposes.
+    With `with_coordinates`, each report also gets a latitude/longitude scattered around its region.
     """
     np.random.seed(42)  # For reproducibility
 
@@ -12,7 +23,7 @@ def generate_sample_intelligence_data(n_samples=100):
     confidence_levels = ['Low', 'Medium', 'High']
 
     data = {
-        'date': pd.date_range(start='2023-01-01', periods=n_samples),
+        'date': pd.date_range(start='2023-01-01', periods=n_samples, freq=freq),
         'source': np.random.choice(sources, n_samples),
         'region': np.random.choice(regions, n_samples),
         'confidence': np.random.choice(confidence_levels, n_samples),
@@ -20,6 +31,12 @@ def generate_sample_intelligence_data(n_samples=100):
     }
 
     df = pd.DataFrame(data)
+
+    if with_coordinates:
+        centers = pd.DataFrame.from_dict(REGION_CENTERS, orient='index').reindex(df['region']).to_numpy()
+        lat, lon, spread = centers[:, 0], centers[:, 1], centers[:, 2]
+        df['latitude'] = np.clip(lat + np.random.normal(0, 1, n_samples) * spread, -90, 90)
+        df['longitude'] = (lon + np.random.normal(0, 1, n_samples) * spread * 1.5 + 180) % 360 - 180
     return df
 
 def get_source_distribution(df):
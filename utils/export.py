@@ -0,0 +1,282 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from utils.data_generator import get_source_distribution, get_confidence_by_source, get_importance_by_region
+
+EXPORT_DIR_ENV = 'ASIH_EXPORT_DIR'
+REPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+def iter_chunks(reports, chunk_size=10000):
+    """
+    Yield DataFrame chunks from a DataFrame, an iterable of DataFrames or an iterable of dicts.
+    """
+    if isinstance(reports, pd.DataFrame):
+        for start in range(0, len(reports), chunk_size):
+            yield reports.iloc[start:start + chunk_size]
+        return
+
+    records = []
+    for item in reports:
+        if isinstance(item, pd.DataFrame):
+            yield item
+            continue
+        records.append(item)
+        if len(records) >= chunk_size:
+            yield pd.DataFrame.from_records(records)
+            records = []
+    if records:
+        yield pd.DataFrame.from_records(records)
+
+
+def apply_filters(chunk, filters):
+    """
+    Filter a chunk with a dict of column -> allowed values (list) or (min, max) range (tuple).
+    """
+    for column, condition in (filters or {}).items():
+        if isinstance(condition, tuple):
+            low, high = condition
+            chunk = chunk[chunk[column].between(low, high)]
+        else:
+            chunk = chunk[chunk[column].isin(condition)]
+    return chunk
+
+
+def export_reports(reports, path, fmt='csv', filters=None, chunk_size=10000):
+    """
+    Stream reports to CSV, JSONL or Parquet one chunk at a time. Returns the number of rows written.
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    rows = 0
+    if fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for chunk in iter_chunks(reports, chunk_size):
+                chunk = apply_filters(chunk, filters)
+                if chunk.empty:
+                    continue
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    with open(path, 'w', newline='') as f:
+        for chunk in iter_chunks(reports, chunk_size):
+            chunk = apply_filters(chunk, filters)
+            if chunk.empty:
+                continue
+            if fmt == 'csv':
+                chunk.to_csv(f, header=rows == 0, index=False)
+            else:
+                f.write(chunk.to_json(orient='records', lines=True, date_format='iso').rstrip('\n') + '\n')
+            rows += len(chunk)
+    return rows
+
+
+def export_aggregates(df, directory, fmt='csv'):
+    """
+    Write the dashboard's aggregate tables (source distribution, confidence by source and
+    importance by region) to `directory`. Returns the written file paths.
+    """
+    aggregates = {
+        'source_distribution': (get_source_distribution, 'source', 'count'),
+        'confidence_by_source': (get_confidence_by_source, 'source', 'avg_confidence'),
+        'importance_by_region': (get_importance_by_region, 'region', 'avg_importance'),
+    }
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, (aggregate, key_column, value_column) in aggregates.items():
+        table = pd.Series(aggregate(df.copy()), name=value_column).rename_axis(key_column).reset_index()
+        path = os.path.join(directory, f"{name}.{fmt}")
+        export_reports(table, path, fmt)
+        paths.append(path)
+    return paths
+
+
+def render_figure(fig, path):
+    """
+    Render a Plotly figure to a static image, or to standalone HTML when the path ends in .html.
+    Static formats (png, svg, pdf) require the optional `kaleido` package.
+    """
+    if path.endswith('.html'):
+        fig.write_html(path, include_plotlyjs='cdn')
+    else:
+        fig.write_image(path)
+    return path
+
+
+class ExportService:
+    """
+    Runs exports in a background thread pool so they never block the interactive session.
+
+    Each submitted job gets an id whose status, output paths and error can be polled with `job`.
+
+    Finished jobs are forgotten, and their files deleted, once they are older than `max_age`
+    seconds or more than `max_jobs` jobs are kept. Files in `export_dir` older than `max_age` are
+    removed too, including ones left by earlier runs.
+    """
+
+    def __init__(self, export_dir=None, max_workers=2, max_jobs=100, max_age=24 * 3600):
+        self.export_dir = export_dir or os.environ.get(EXPORT_DIR_ENV) or \
+            os.path.join(tempfile.gettempdir(), 'asih_exports')
+        self.max_jobs = max_jobs
+        self.max_age = max_age
+        os.makedirs(self.export_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _remove_output(self, path):
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def prune(self, now=None):
+        """
+        Drop expired or excess finished jobs and delete their files, then remove any other
+        output in `export_dir` older than `max_age`. Returns the number of jobs dropped.
+        """
+        now = now or time.time()
+        with self._lock:
+            finished = sorted((job for job in self._jobs.values() if job['status'] in ('done', 'failed')),
+                              key=lambda job: job['submitted'])
+            excess = len(self._jobs) - self.max_jobs
+            dropped = [job for i, job in enumerate(finished) if i < excess or now - job['submitted'] > self.max_age]
+            for job in dropped:
+                del self._jobs[job['id']]
+            active_outputs = {job['output'] for job in self._jobs.values()}
+
+        for job in dropped:
+            self._remove_output(job['output'])
+        for name in os.listdir(self.export_dir):
+            path = os.path.join(self.export_dir, name)
+            try:
+                expired = now - os.path.getmtime(path) > self.max_age
+            except FileNotFoundError:
+                continue
+            if expired and path not in active_outputs:
+                self._remove_output(path)
+        return len(dropped)
+
+    def _submit(self, kind, description, output, func, *args):
+        self.prune()
+        job_id = uuid.uuid4().hex[:12]
+        job = {'id': job_id, 'kind': kind, 'description': description, 'status': 'queued',
+               'submitted': time.time(), 'paths': [], 'error': None, 'output': output}
+        with self._lock:
+            self._jobs[job_id] = job
+
+        def run():
+            job['status'] = 'running'
+            try:
+                job['paths'] = func(*args)
+                job['status'] = 'done'
+            except Exception as e:
+                job['error'] = str(e)
+                job['status'] = 'failed'
+
+        self._executor.submit(run)
+        return job_id
+
+    def submit_reports(self, reports, fmt='csv', filters=None, name='reports'):
+        """
+        Queue a streamed report export.
+        """
+        path = os.path.join(self.export_dir, f"{name}_{uuid.uuid4().hex[:8]}.{fmt}")
+
+        def run():
+            export_reports(reports, path, fmt, filters)
+            return [path]
+        return self._submit('reports', f"{name} ({fmt})", path, run)
+
+    def submit_aggregates(self, df, fmt='csv'):
+        """
+        Queue an export of the aggregate tables.
+        """
+        directory = os.path.join(self.export_dir, f"aggregates_{uuid.uuid4().hex[:8]}")
+        return self._submit('aggregates', f"aggregate tables ({fmt})", directory, export_aggregates, df, directory, fmt)
+
+    def submit_figures(self, figures, fmt='png'):
+        """
+        Queue rendering of a dict of name -> Plotly figure. Figures are rendered in parallel.
+        """
+        directory = os.path.join(self.export_dir, f"figures_{uuid.uuid4().hex[:8]}")
+
+        def run():
+            os.makedirs(directory, exist_ok=True)
+            with ThreadPoolExecutor(max_workers=min(4, len(figures)) or 1) as pool:
+                return list(pool.map(lambda item: render_figure(item[1], os.path.join(directory, f"{item[0]}.{fmt}")),
+                                     figures.items()))
+        return self._submit('figures', f"{len(figures)} figures ({fmt})", directory, run)
+
+    def job(self, job_id):
+        """
+        A job's current state, or None if it has been pruned.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def jobs(self):
+        """
+        All jobs, most recent first.
+        """
+        with self._lock:
+            return sorted((dict(job) for job in self._jobs.values()), key=lambda job: -job['submitted'])
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_export_service():
+    """
+    Return the process-wide export service.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ExportService()
+        return _service
+
+
+if __name__ == "__main__":
+    # Test report, aggregate and figure exports
+    from utils.data_generator import generate_sample_intelligence_data
+    from utils.visualizations import create_source_distribution_chart
+
+    sample_data = generate_sample_intelligence_data(1000)
+    service = ExportService(export_dir=tempfile.mkdtemp(prefix='asih_export_test_'))
+    jobs = [
+        service.submit_reports(sample_data, 'jsonl', filters={'source': ['OSINT', 'HUMINT']}),
+        service.submit_reports(sample_data, 'parquet', filters={'importance': (8, 10)}),
+        service.submit_aggregates(sample_data),
+        service.submit_figures({'sources': create_source_distribution_chart(get_source_distribution(sample_data))}, 'html'),
+    ]
+    service._executor.shutdown(wait=True)
+    for job_id in jobs:
+        job = service.job(job_id)
+        print(job['description'], job['status'], job['paths'], job['error'] or '')
+    print("Aggregate columns:", [list(pd.read_csv(path).columns) for path in service.job(jobs[2])['paths']])
+    service.max_jobs = 2
+    print("Jobs pruned:", service.prune(), "| remaining outputs:", len(os.listdir(service.export_dir)))
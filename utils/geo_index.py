@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def _grid_bits(precision):
+    """
+    Number of longitude and latitude bits in a geohash of the given precision (characters).
+    """
+    bits = 5 * precision
+    return (bits + 1) // 2, bits // 2
+
+
+def cell_size(precision):
+    """
+    Width and height in degrees of a geohash cell at the given precision.
+    """
+    lon_bits, lat_bits = _grid_bits(precision)
+    return 360.0 / (1 << lon_bits), 180.0 / (1 << lat_bits)
+
+
+def _cell_indices(lat, lon, precision):
+    lon_bits, lat_bits = _grid_bits(precision)
+    width, height = cell_size(precision)
+    col = np.clip(((np.asarray(lon, dtype=float) + 180.0) // width).astype(np.int64), 0, (1 << lon_bits) - 1)
+    row = np.clip(((np.asarray(lat, dtype=float) + 90.0) // height).astype(np.int64), 0, (1 << lat_bits) - 1)
+    return row, col
+
+
+def geohash(row, col, precision):
+    """
+    Geohash string of the cell at grid position (row, col) for the given precision.
+    """
+    lon_bits, lat_bits = _grid_bits(precision)
+    code = 0
+    # Geohash interleaves bits starting with longitude
+    for i in range(5 * precision):
+        if i % 2 == 0:
+            lon_bits -= 1
+            code = (code << 1) | ((col >> lon_bits) & 1)
+        else:
+            lat_bits -= 1
+            code = (code << 1) | ((row >> lat_bits) & 1)
+    return ''.join(_BASE32[(code >> shift) & 31] for shift in range(5 * (precision - 1), -1, -5))
+
+
+def encode(lat, lon, precision=5):
+    """
+    Geohash string for a single coordinate.
+    """
+    row, col = _cell_indices(lat, lon, precision)
+    return geohash(int(row), int(col), precision)
+
+
+class GeoTileIndex:
+    """
+    Multi-resolution grid index of geolocated reports using geohash cells.
+
+    For each precision level, every non-empty cell holds the pre-aggregated report count and
+    importance sum. Queries enumerate only the cells inside the visible bounding box at a level
+    coarse enough to keep the cell count bounded, so their cost does not depend on the number of
+    reports indexed.
+    """
+
+    def __init__(self, precisions=(1, 2, 3, 4, 5, 6)):
+        self.precisions = tuple(sorted(precisions))
+        self._cells = {precision: {} for precision in self.precisions}
+        self.n_reports = 0
+
+    def add(self, lat, lon, importance):
+        """
+        Add one or many reports (scalars or arrays of equal length) to every level.
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        importance = np.atleast_1d(np.asarray(importance, dtype=float))
+        for precision in self.precisions:
+            lon_bits, _ = _grid_bits(precision)
+            row, col = _cell_indices(lat, lon, precision)
+            codes = (row << lon_bits) | col
+            sums = pd.DataFrame({'code': codes, 'importance': importance}).groupby('code')['importance'].agg(['size', 'sum'])
+            cells = self._cells[precision]
+            for code, count, total in zip(sums.index, sums['size'], sums['sum']):
+                cell = cells.get(code)
+                if cell is None:
+                    cells[code] = [int(count), float(total)]
+                else:
+                    cell[0] += int(count)
+                    cell[1] += float(total)
+        self.n_reports += len(lat)
+
+    def add_dataframe(self, df, lat='latitude', lon='longitude', importance='importance'):
+        """
+        Add all rows of a report DataFrame that carry coordinates.
+        """
+        located = df.dropna(subset=[lat, lon])
+        self.add(located[lat].to_numpy(), located[lon].to_numpy(), located[importance].to_numpy())
+
+    def choose_precision(self, bbox, max_cells=2000):
+        """
+        Finest precision level at which `bbox` is covered by at most `max_cells` cells.
+        """
+        min_lat, min_lon, max_lat, max_lon = bbox
+        chosen = self.precisions[0]
+        for precision in self.precisions:
+            width, height = cell_size(precision)
+            n_cells = (np.floor(max_lon / width) - np.floor(min_lon / width) + 1) * \
+                      (np.floor(max_lat / height) - np.floor(min_lat / height) + 1)
+            if n_cells > max_cells:
+                break
+            chosen = precision
+        return chosen
+
+    def query(self, bbox, precision=None, max_cells=2000):
+        """
+        Aggregated cells inside `bbox` = (min_lat, min_lon, max_lat, max_lon).
+
+        Returns a DataFrame with one row per non-empty cell: geohash, cell centre, report count and
+        average importance.
+        """
+        precision = precision or self.choose_precision(bbox, max_cells)
+        min_lat, min_lon, max_lat, max_lon = bbox
+        lon_bits, _ = _grid_bits(precision)
+        width, height = cell_size(precision)
+        (min_row, max_row), (min_col, max_col) = _cell_indices([min_lat, max_lat], [min_lon, max_lon], precision)
+
+        cells = self._cells[precision]
+        rows = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                cell = cells.get((row << lon_bits) | col)
+                if cell is not None:
+                    rows.append({
+                        'geohash': geohash(row, col, precision),
+                        'latitude': -90.0 + (row + 0.5) * height,
+                        'longitude': -180.0 + (col + 0.5) * width,
+                        'count': cell[0],
+                        'avg_importance': cell[1] / cell[0],
+                    })
+        return pd.DataFrame(rows, columns=['geohash', 'latitude', 'longitude', 'count', 'avg_importance'])
+
+
+if __name__ == "__main__":
+    # Test indexing and viewport queries
+    rng = np.random.default_rng(0)
+    index = GeoTileIndex()
+    index.add(rng.normal(48, 5, 100000), rng.normal(10, 8, 100000), rng.integers(1, 11, 100000))
+    print("Geohash of Paris:", encode(48.8566, 2.3522, precision=6))
+    europe = (35.0, -10.0, 60.0, 30.0)
+    print("Precision for Europe:", index.choose_precision(europe))
+    print(index.query(europe).sort_values('count', ascending=False).head())
@@ -0,0 +1,240 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from utils.cache_backend import default_private_dir, ensure_private_dir
+
+# Placeholder value for entries that currently live only on disk
+_SPILLED = object()
+
+
+class _Session:
+    def __init__(self):
+        # key -> (value or _SPILLED, spill path or None, size in bytes); ordered from least to most recently used
+        self.entries = OrderedDict()
+        self.memory_bytes = 0
+        self.last_access = time.time()
+
+
+class SessionStore:
+    """
+    Memory-bounded store for large per-session objects.
+
+    Each session keeps at most `session_budget` bytes in memory, and all sessions together keep at
+    most `total_budget` bytes. Least recently used objects beyond those budgets are pickled to a
+    spill directory on disk and loaded back transparently on access. Sessions idle for longer than
+    `idle_timeout` seconds are dropped together with their spill files. Spill files are unpickled,
+    so the spill directory must be private to the app's user (see `ensure_private_dir`).
+    """
+
+    def __init__(self, session_budget=8 * 1024 * 1024, total_budget=256 * 1024 * 1024,
+                 idle_timeout=1800, spill_dir=None, gc_interval=60):
+        self.session_budget = session_budget
+        self.total_budget = total_budget
+        self.idle_timeout = idle_timeout
+        self.spill_dir = ensure_private_dir(spill_dir or default_private_dir('asih_spill'))
+        self.gc_interval = gc_interval
+        self._sessions = {}
+        self._memory_bytes = 0
+        self._last_gc = time.time()
+        self._lock = threading.RLock()
+
+    @property
+    def memory_bytes(self):
+        return self._memory_bytes
+
+    def _session(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session()
+        session.last_access = time.time()
+        return session
+
+    def _spill_path(self, session_id, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.spill_dir, hashlib.sha1(session_id.encode()).hexdigest(), digest + '.pkl')
+
+    def _spill(self, session_id, session, key):
+        value, _, size = session.entries[key]
+        path = self._spill_path(session_id, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        session.entries[key] = (_SPILLED, path, size)
+        session.memory_bytes -= size
+        self._memory_bytes -= size
+
+    def _evict(self, session_id, session, keep=None):
+        # Spill this session's least recently used objects until it fits its own budget
+        for key in list(session.entries):
+            if session.memory_bytes <= self.session_budget:
+                break
+            if key != keep and session.entries[key][0] is not _SPILLED:
+                self._spill(session_id, session, key)
+
+        # Then spill from the least recently active sessions until the process fits the total budget
+        for other_id, other in sorted(self._sessions.items(), key=lambda item: item[1].last_access):
+            for key in list(other.entries):
+                if self._memory_bytes <= self.total_budget:
+                    return
+                if (other_id, key) != (session_id, keep) and other.entries[key][0] is not _SPILLED:
+                    self._spill(other_id, other, key)
+
+    def set(self, session_id, key, value):
+        """
+        Store `value` for a session, spilling older objects to disk if the budget is exceeded.
+        """
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(payload)
+        with self._lock:
+            session = self._session(session_id)
+            self._discard(session, key)
+            if size > self.session_budget:
+                # An object larger than the whole budget goes straight to disk without evicting anything
+                path = self._spill_path(session_id, key)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(payload)
+                session.entries[key] = (_SPILLED, path, size)
+            else:
+                session.entries[key] = (value, None, size)
+                session.memory_bytes += size
+                self._memory_bytes += size
+                self._evict(session_id, session, keep=key)
+            self._maybe_collect()
+
+    def get(self, session_id, key, default=None):
+        """
+        Return a stored value, loading it back from disk if it was spilled.
+        """
+        with self._lock:
+            session = self._session(session_id)
+            entry = session.entries.get(key)
+            if entry is None:
+                return default
+            session.entries.move_to_end(key)
+            value, path, size = entry
+            if value is not _SPILLED:
+                return value
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError):
+                self._discard(session, key)
+                return default
+            if size <= self.session_budget:
+                # Callers may mutate the returned object, so the file is rewritten on the next spill
+                os.remove(path)
+                session.entries[key] = (value, None, size)
+                session.memory_bytes += size
+                self._memory_bytes += size
+                self._evict(session_id, session, keep=key)
+            return value
+
+    def _discard(self, session, key):
+        entry = session.entries.pop(key, None)
+        if entry is None:
+            return
+        value, path, size = entry
+        if value is not _SPILLED:
+            session.memory_bytes -= size
+            self._memory_bytes -= size
+        if path is not None:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def delete(self, session_id, key):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._discard(session, key)
+
+    def drop_session(self, session_id):
+        """
+        Remove a session and its spill files.
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return
+            self._memory_bytes -= session.memory_bytes
+            shutil.rmtree(os.path.dirname(self._spill_path(session_id, '')), ignore_errors=True)
+
+    def collect_idle(self, now=None):
+        """
+        Drop sessions that have not been accessed within `idle_timeout` seconds. Returns how many were dropped.
+        """
+        now = now or time.time()
+        with self._lock:
+            idle = [session_id for session_id, session in self._sessions.items()
+                    if now - session.last_access > self.idle_timeout]
+            for session_id in idle:
+                self.drop_session(session_id)
+            self._last_gc = now
+            return len(idle)
+
+    def _maybe_collect(self):
+        if time.time() - self._last_gc > self.gc_interval:
+            self.collect_idle()
+
+    def stats(self, session_id):
+        """
+        In-memory and spilled byte counts for a session.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return {'memory_bytes': 0, 'spilled_bytes': 0, 'objects': 0}
+            spilled = sum(size for value, path, size in session.entries.values() if value is _SPILLED)
+            return {'memory_bytes': session.memory_bytes, 'spilled_bytes': spilled, 'objects': len(session.entries)}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """
+    Return the process-wide session store shared by all pages.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore()
+        return _store
+
+
+def current_session_id():
+    """
+    Id of the Streamlit session running the current script.
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else 'default'
+
+
+if __name__ == "__main__":
+    # Test budgets, spilling and idle collection
+    store = SessionStore(session_budget=10000, total_budget=15000, idle_timeout=1,
+                         spill_dir=tempfile.mkdtemp(prefix='asih_spill_test_'))
+    store.set('a', 'articles', [f"article {i} " * 10 for i in range(60)])
+    store.set('a', 'more_articles', [f"update {i} " * 10 for i in range(60)])
+    print("Session a:", store.stats('a'))
+    store.set('b', 'articles', [f"report {i} " * 10 for i in range(60)])
+    print("Total in memory:", store.memory_bytes)
+    print("Spilled value intact:", store.get('a', 'articles')[0][:10])
+    store.set('c', 'small', [1] * 100)
+    store.set('c', 'huge', list(range(50000)))
+    print("Large value spilled directly:", store.stats('c'))
+    articles = store.get('a', 'articles')
+    articles.append('edited')
+    store.set('a', 'filler', [f"filler {i} " * 10 for i in range(60)])
+    print("In-place edit kept across spill:", store.get('a', 'articles')[-1])
+    print("Idle sessions collected:", store.collect_idle(now=time.time() + 5))
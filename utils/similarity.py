@@ -0,0 +1,218 @@
+import threading
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.decomposition import TruncatedSVD
+from sklearn.cluster import MiniBatchKMeans
+from utils.text_processing import tokenize, preprocess_corpus, content_hash
+
+
+class ReportEmbedder:
+    """
+    Offline text embedder: TF-IDF followed by truncated SVD (latent semantic analysis).
+
+    Produces dense, L2-normalised float32 vectors so that a dot product is a cosine similarity.
+    Tokens come from the shared preprocessing pipeline. The vocabulary is fixed at fit time;
+    terms first seen in later reports are ignored.
+    """
+
+    def __init__(self, n_components=64, max_features=50000, random_state=42):
+        self.n_components = n_components
+        self.vectorizer = TfidfVectorizer(analyzer=tokenize, max_features=max_features, sublinear_tf=True)
+        self.svd = None
+        self.feature_names = None
+        self.random_state = random_state
+
+    def fit(self, texts):
+        preprocess_corpus(texts)
+        tfidf = self.vectorizer.fit_transform(texts)
+        # Building the feature names sorts the whole vocabulary, so it is done once here
+        self.feature_names = self.vectorizer.get_feature_names_out()
+        # SVD needs strictly fewer components than features and samples
+        n_components = max(1, min(self.n_components, tfidf.shape[1] - 1, tfidf.shape[0] - 1))
+        self.svd = TruncatedSVD(n_components=n_components, random_state=self.random_state)
+        self.svd.fit(tfidf)
+        return self
+
+    def transform(self, texts):
+        preprocess_corpus(texts)
+        vectors = self.svd.transform(self.vectorizer.transform(texts)).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def top_terms(self, vectors, n_terms=5):
+        """
+        Map vectors in embedding space back to their highest-weighted vocabulary terms, one list per row.
+        """
+        weights = np.atleast_2d(vectors) @ self.svd.components_
+        n_terms = min(n_terms, weights.shape[1])
+        top = np.argpartition(-weights, n_terms - 1, axis=1)[:, :n_terms]
+        order = np.take_along_axis(weights, top, axis=1).argsort(axis=1)[:, ::-1]
+        return [list(self.feature_names[row]) for row in np.take_along_axis(top, order, axis=1)]
+
+
+class ReportIndex:
+    """
+    Approximate nearest-neighbour index over report embeddings (inverted file / IVF).
+
+    Reports are assigned to the nearest of `n_lists` k-means centroids. A query only scans the
+    `n_probe` lists whose centroids are closest to it, so lookups touch roughly n_probe / n_lists
+    of the corpus. The centroids double as topic clusters.
+
+    New reports are added incrementally with `add`: they are embedded with the fitted model and
+    appended to their nearest list without retraining. Reports already indexed (by content hash)
+    are skipped. All methods are safe to call from concurrent script threads.
+    """
+
+    def __init__(self, n_lists=None, n_probe=8, n_components=64, train_sample=20000, random_state=42):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_sample = train_sample
+        self.random_state = random_state
+        self.embedder = ReportEmbedder(n_components=n_components, random_state=random_state)
+        self.kmeans = None
+        self.documents = []
+        self._ids_by_hash = {}
+        self._lists = []
+        self._pending = []
+        self._cluster_terms = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def build(self, texts):
+        """
+        Fit the embedder and coarse quantiser on `texts` and index them.
+        """
+        with self._lock:
+            return self._build(list(texts))
+
+    def _build(self, texts):
+        rng = np.random.default_rng(self.random_state)
+        if len(texts) > self.train_sample:
+            sample = [texts[i] for i in rng.choice(len(texts), self.train_sample, replace=False)]
+        else:
+            sample = texts
+        self.embedder.fit(sample)
+
+        n_lists = self.n_lists or int(np.sqrt(len(texts)))
+        n_lists = max(1, min(n_lists, len(sample)))
+        self.kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=self.random_state, n_init=3)
+        self.kmeans.fit(self.embedder.transform(sample))
+
+        self.documents = []
+        self._ids_by_hash = {}
+        self._cluster_terms = None
+        self._lists = [(np.empty(0, dtype=np.int64), np.empty((0, self._dim), dtype=np.float32))
+                       for _ in range(n_lists)]
+        self._pending = [[] for _ in range(n_lists)]
+        self.add(texts)
+        return self
+
+    @property
+    def _dim(self):
+        return self.embedder.svd.components_.shape[0]
+
+    def add(self, texts, batch_size=10000):
+        """
+        Embed and index new reports. Returns the id of each report; reports that are already
+        indexed keep their existing id.
+        """
+        texts = list(texts)
+        hashes = [content_hash(text) for text in texts]
+        with self._lock:
+            start = len(self.documents)
+            new_texts = []
+            for text, key in zip(texts, hashes):
+                if key not in self._ids_by_hash:
+                    self._ids_by_hash[key] = start + len(new_texts)
+                    new_texts.append(text)
+
+            for offset in range(0, len(new_texts), batch_size):
+                batch = new_texts[offset:offset + batch_size]
+                vectors = self.embedder.transform(batch)
+                assignments = self.kmeans.predict(vectors)
+                ids = np.arange(start + offset, start + offset + len(batch))
+                for list_no in np.unique(assignments):
+                    mask = assignments == list_no
+                    self._pending[list_no].append((ids[mask], vectors[mask]))
+            self.documents.extend(new_texts)
+            return [self._ids_by_hash[key] for key in hashes]
+
+    def _get_list(self, list_no):
+        # Merge pending appends lazily so incremental adds stay cheap
+        if self._pending[list_no]:
+            ids, vectors = self._lists[list_no]
+            pending_ids, pending_vectors = zip(*self._pending[list_no])
+            self._lists[list_no] = (np.concatenate([ids, *pending_ids]),
+                                    np.vstack([vectors, *pending_vectors]))
+            self._pending[list_no] = []
+        return self._lists[list_no]
+
+    def search(self, text, k=5, n_probe=None):
+        """
+        Return the `k` most similar indexed reports as (id, document, cosine similarity) tuples.
+        """
+        query = self.embedder.transform([text])[0]
+        n_probe = min(n_probe or self.n_probe, len(self._lists))
+        centroid_scores = self.kmeans.cluster_centers_ @ query
+        probe = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+
+        with self._lock:
+            candidates = [self._get_list(list_no) for list_no in probe]
+        ids = np.concatenate([c[0] for c in candidates])
+        if len(ids) == 0:
+            return []
+        scores = np.vstack([c[1] for c in candidates]) @ query
+
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        with self._lock:
+            return [(int(ids[i]), self.documents[ids[i]], float(scores[i])) for i in top]
+
+    def clusters(self, n_terms=5):
+        """
+        Summarise the topic clusters as a list of dicts with cluster id, size and top terms.
+        """
+        with self._lock:
+            # Centroids and vocabulary only change on build, so their terms are computed once
+            if self._cluster_terms is None or self._cluster_terms[0] != n_terms:
+                terms = self.embedder.top_terms(self.kmeans.cluster_centers_, n_terms)
+                self._cluster_terms = (n_terms, [', '.join(row) for row in terms])
+            sizes = [len(ids) + sum(len(pending_ids) for pending_ids, _ in pending)
+                     for (ids, _), pending in zip(self._lists, self._pending)]
+            return [{'cluster': list_no, 'size': size, 'top_terms': terms}
+                    for list_no, (size, terms) in enumerate(zip(sizes, self._cluster_terms[1]))]
+
+    def cluster_members(self, list_no):
+        """
+        Return the documents assigned to a topic cluster.
+        """
+        with self._lock:
+            ids, _ = self._get_list(list_no)
+            return [self.documents[i] for i in ids]
+
+
+if __name__ == "__main__":
+    # Test index construction, incremental adds and lookups
+    sample_reports = [
+        "Increased military activity observed near the border",
+        "Troop movements reported close to the disputed border",
+        "Economic indicators show stable growth in the region",
+        "New trade agreement signed, expected to boost exports",
+        "Cybersecurity threats on the rise in financial sector",
+        "Ransomware attack disrupts banking services",
+    ]
+    index = ReportIndex(n_probe=2).build(sample_reports)
+    index.add(["Phishing campaign targets financial institutions"])
+    index.add(["Phishing campaign targets financial institutions"])
+    print("Indexed reports:", len(index))
+    print("\nSimilar to 'border military buildup':")
+    for report_id, document, score in index.search("border military buildup", k=3):
+        print(f"{score:.2f} {document}")
+    print("\nClusters:")
+    for cluster in index.clusters():
+        print(cluster)
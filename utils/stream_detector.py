@@ -0,0 +1,304 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+@lru_cache(maxsize=65536)
+def _sketch_columns(key, width, depth):
+    digest = hashlib.blake2b(str(key).encode(), digest_size=8 * depth).digest()
+    return tuple(int(h) % width for h in np.frombuffer(digest, dtype=np.uint64))
+
+
+class CountMinSketch:
+    """
+    Fixed-size frequency sketch. Estimates never undercount; overcounts are bounded by the width.
+    Counts can also be subtracted, which lets sketches be combined into sliding windows.
+    """
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.float64)
+        # Row views avoid fancy-indexing overhead on the per-report path
+        self._row_views = list(self.table)
+
+    def add(self, key, value=1.0):
+        for row, column in zip(self._row_views, _sketch_columns(key, self.width, self.depth)):
+            row[column] += value
+
+    def estimate(self, key):
+        return min(row[column] for row, column in zip(self._row_views, _sketch_columns(key, self.width, self.depth)))
+
+    def clear(self):
+        self.table.fill(0)
+
+
+class EWMA:
+    """
+    Exponentially weighted moving average and variance of a scalar series.
+    """
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.mean = None
+        self.var = 0.0
+
+    def update(self, value):
+        if self.mean is None:
+            self.mean = float(value)
+            return self.mean
+        diff = value - self.mean
+        increment = self.alpha * diff
+        self.mean += increment
+        self.var = (1 - self.alpha) * (self.var + diff * increment)
+        return self.mean
+
+    @property
+    def std(self):
+        return self.var ** 0.5
+
+
+class SurgeDetector:
+    """
+    Streaming surge detector over per-source and per-region activity.
+
+    The sliding window is a ring of `n_buckets` time buckets. Report counts and importance sums are
+    kept in count-min sketches: one for the whole window and one for the current bucket. When a
+    bucket closes, its sketch is folded into an EWMA baseline sketch. When it expires, it is
+    subtracted from the window. Memory is fixed by the sketch dimensions. Each report costs O(depth).
+    Updates and reads are serialised by a lock, so ingestion threads and page scripts can share one
+    detector. Active surges are re-checked whenever a bucket closes, so a key that goes quiet stops
+    being reported as active even if it never sees another report.
+    """
+
+    def __init__(self, window_seconds=3600, n_buckets=12, alpha=0.02, threshold=2.0, min_count=10,
+                 width=2048, depth=4, max_alerts=50, max_observed=100000):
+        self.bucket_seconds = window_seconds / n_buckets
+        self.n_buckets = n_buckets
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_count = min_count
+        self.max_alerts = max_alerts
+        self.max_observed = max_observed
+
+        self._buckets = [(CountMinSketch(width, depth), CountMinSketch(width, depth)) for _ in range(n_buckets)]
+        self.window_counts = CountMinSketch(width, depth)
+        self.window_importance = CountMinSketch(width, depth)
+        self.baseline = CountMinSketch(width, depth)
+        self.rate = EWMA(alpha)
+        self.importance = EWMA(alpha)
+
+        self.n_reports = 0
+        self._bucket_index = None
+        self._bucket_reports = 0
+        self._buckets_closed = 0
+        self._active = OrderedDict()
+        self.alerts = []
+        # Ids of reports already counted by `observe`, so re-fetched or re-read reports count once
+        self._observed = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _advance(self, timestamp):
+        bucket_index = int(timestamp // self.bucket_seconds)
+        if self._bucket_index is None:
+            self._bucket_index = bucket_index
+        # Rotation work is bounded by n_buckets per call, whatever the gap between reports
+        n_closed = min(bucket_index - self._bucket_index, self.n_buckets)
+        for _ in range(n_closed):
+            self._close_bucket()
+        self._bucket_index = max(self._bucket_index, bucket_index)
+        if n_closed > 0:
+            # Surges on keys that have gone quiet end as their reports leave the window
+            for key in list(self._active):
+                if not self._still_surging(key):
+                    del self._active[key]
+
+    def _close_bucket(self):
+        counts, _ = self._buckets[self._bucket_index % self.n_buckets]
+        self.baseline.table *= 1 - self.alpha
+        self.baseline.table += self.alpha * counts.table
+        self.rate.update(self._bucket_reports)
+        self._bucket_reports = 0
+        self._buckets_closed += 1
+
+        # The next bucket in the ring is the oldest one; expire it from the window
+        self._bucket_index += 1
+        expired_counts, expired_importance = self._buckets[self._bucket_index % self.n_buckets]
+        self.window_counts.table -= expired_counts.table
+        self.window_importance.table -= expired_importance.table
+        expired_counts.clear()
+        expired_importance.clear()
+
+    def update(self, source, region, importance, timestamp):
+        """
+        Ingest one report and return the alerts it triggered (possibly none).
+
+        `timestamp` may be seconds since the epoch, a datetime, a pd.Timestamp or a np.datetime64;
+        naive values are taken as UTC. A `region` of None only updates the source.
+        """
+        if isinstance(timestamp, (pd.Timestamp, np.datetime64)):
+            timestamp = pd.Timestamp(timestamp).timestamp()
+        elif isinstance(timestamp, datetime):
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+            timestamp = timestamp.timestamp()
+        with self._lock:
+            return self._update(source, region, importance, timestamp)
+
+    def _update(self, source, region, importance, timestamp):
+        self._advance(timestamp)
+        self.n_reports += 1
+        self._bucket_reports += 1
+        self.importance.update(importance)
+
+        counts, importance_sums = self._buckets[self._bucket_index % self.n_buckets]
+        triggered = []
+        keys = [f"Source {source}"] if region is None else [f"Source {source}", f"Region {region}"]
+        for key in keys:
+            counts.add(key)
+            importance_sums.add(key, importance)
+            self.window_counts.add(key)
+            self.window_importance.add(key, importance)
+            alert = self._check(key, timestamp)
+            if alert:
+                triggered.append(alert)
+        return triggered
+
+    def _expected(self, key):
+        # Bias-correct the EWMA, which starts from zero
+        return self.baseline.estimate(key) * self.n_buckets / (1 - (1 - self.alpha) ** self._buckets_closed)
+
+    def _still_surging(self, key):
+        # Hysteresis: an ongoing surge only ends once activity drops well below the trigger level
+        count = self.window_counts.estimate(key)
+        return count >= self.min_count and count >= (1 + self.threshold) / 2 * max(self._expected(key), 1.0)
+
+    def _check(self, key, timestamp):
+        # Wait for a full window of history before trusting the baseline
+        if self._buckets_closed < self.n_buckets:
+            return None
+        if key in self._active:
+            if not self._still_surging(key):
+                del self._active[key]
+            return None
+        count = self.window_counts.estimate(key)
+        expected = self._expected(key)
+        if count < self.min_count or count < self.threshold * max(expected, 1.0):
+            return None
+
+        avg_importance = self.window_importance.estimate(key) / count
+        alert = {
+            'key': key,
+            'timestamp': timestamp,
+            'count': int(count),
+            'expected': round(expected, 1),
+            'avg_importance': round(avg_importance, 1),
+            'severity': 'High' if avg_importance >= 7 else 'Medium' if avg_importance >= 4 else 'Low',
+            'message': f"Activity surge for {key}: {int(count)} reports in window vs {expected:.1f} expected",
+        }
+        self._active[key] = alert
+        if len(self._active) > self.max_alerts:
+            self._active.popitem(last=False)
+        self.alerts.append(alert)
+        del self.alerts[:-self.max_alerts]
+        return alert
+
+    def observe(self, reports):
+        """
+        Ingest reports in the connector / News API article shape. Each report counts once, for its
+        INT discipline (OSINT when unknown) and, if it has one, its region. Returns the alerts triggered.
+        """
+        triggered = []
+        for report in reports:
+            key = report.get('id') or report.get('url') or f"{report.get('title')}|{report.get('source')}"
+            with self._lock:
+                if key in self._observed:
+                    continue
+                self._observed[key] = True
+                if len(self._observed) > self.max_observed:
+                    self._observed.popitem(last=False)
+            timestamp = pd.to_datetime(report.get('publishedAt'), errors='coerce', utc=True)
+            triggered += self.update(
+                report.get('discipline') or 'OSINT',
+                report.get('region'),
+                report.get('importance') or 5,
+                time.time() if pd.isna(timestamp) else timestamp,
+            )
+        return triggered
+
+    @property
+    def active_alerts(self):
+        """
+        Alerts whose surge is still ongoing, most recent last.
+        """
+        with self._lock:
+            return list(self._active.values())
+
+    def threat_level(self):
+        """
+        Overall threat level from the number of active surges and the importance trend.
+        """
+        with self._lock:
+            score = len(self._active)
+        if self.importance.mean is not None and self.importance.mean >= 7:
+            score += 2
+        if score >= 4:
+            return 'Critical'
+        if score >= 2:
+            return 'High'
+        if score >= 1:
+            return 'Moderate'
+        return 'Low'
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_surge_detector():
+    """
+    Return the process-wide surge detector that ingested reports are fed into.
+    """
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = SurgeDetector()
+        return _detector
+
+
+def observe_reports(reports):
+    """
+    Feed ingested reports into the process-wide surge detector.
+    """
+    return get_surge_detector().observe(reports)
+
+
+if __name__ == "__main__":
+    # Test detection on a steady stream followed by a regional surge
+    rng = np.random.default_rng(0)
+    detector = SurgeDetector(window_seconds=600, n_buckets=10)
+    regions = ['Europe', 'Asia', 'Africa']
+    for t in range(0, 7200, 2):
+        detector.update('OSINT', regions[rng.integers(3)], int(rng.integers(1, 6)), t)
+    for t in range(7200, 7500):
+        detector.update('SIGINT', 'Asia', 8, t)
+    for alert in detector.alerts:
+        print(alert['severity'], alert['message'])
+    print("Threat level:", detector.threat_level())
+
+    # The surge ends once SIGINT/Asia goes quiet, even without further reports for those keys
+    for t in range(7500, 9000, 2):
+        detector.update('OSINT', 'Europe', 3, t)
+    print("Active after quiet period:", [alert['key'] for alert in detector.active_alerts], detector.threat_level())
+
+    # Reports from the ingest path, with datetime timestamps
+    live = SurgeDetector()
+    live.update('OSINT', None, 5, datetime(2024, 1, 1, 12, 0))
+    live.observe([{'id': 'a', 'discipline': 'SIGINT', 'region': 'Asia', 'publishedAt': '2024-01-01T12:05:00Z'}] * 2)
+    print("Observed reports:", live.n_reports, "| process-wide detector unaffected:", get_surge_detector().n_reports)
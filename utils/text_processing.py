@@ -0,0 +1,182 @@
+import atexit
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from nltk.tokenize import RegexpTokenizer
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+# Same token pattern as scikit-learn's default vectorizers: words of two or more characters
+_tokenizer = RegexpTokenizer(r"\w\w+")
+_stop_words = None
+_lemmatize = None
+
+# Corpora smaller than this are tokenized in-process; process start-up would dominate otherwise
+PARALLEL_THRESHOLD = 2000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_stop_words():
+    """
+    NLTK's English stop words when the corpus is installed, scikit-learn's list otherwise.
+    """
+    global _stop_words
+    if _stop_words is None:
+        try:
+            from nltk.corpus import stopwords
+            _stop_words = frozenset(stopwords.words('english')) | ENGLISH_STOP_WORDS
+        except LookupError:
+            _stop_words = ENGLISH_STOP_WORDS
+    return _stop_words
+
+
+def _get_lemmatizer():
+    """
+    WordNet lemmatizer when the corpus is installed; otherwise tokens are left as they are.
+    """
+    global _lemmatize
+    if _lemmatize is None:
+        try:
+            from nltk.stem import WordNetLemmatizer
+            lemmatizer = WordNetLemmatizer()
+            lemmatizer.lemmatize('reports')
+            _lemmatize = lemmatizer.lemmatize
+        except LookupError:
+            _lemmatize = lambda token: token
+    return _lemmatize
+
+
+def preprocess_text(text):
+    """
+    Tokenize, lowercase, remove stop words and lemmatize a single report.
+    """
+    stop_words = _get_stop_words()
+    lemmatize = _get_lemmatizer()
+    tokens = []
+    for token in _tokenizer.tokenize(text.lower()):
+        if token in stop_words:
+            continue
+        token = lemmatize(token)
+        if token not in stop_words:
+            tokens.append(token)
+    return tuple(tokens)
+
+
+def content_hash(text):
+    """
+    Stable hash of a report's text, used as its cache key.
+    """
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class TokenCache:
+    """
+    Thread-safe LRU cache of token tuples keyed by content hash.
+    """
+
+    def __init__(self, max_entries=500000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            tokens = self._entries.get(key)
+            if tokens is not None:
+                self._entries.move_to_end(key)
+            return tokens
+
+    def put(self, key, tokens):
+        with self._lock:
+            self._entries[key] = tokens
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache()
+
+
+def tokenize(text):
+    """
+    Return the cached tokens for a report, preprocessing it on first use.
+
+    Suitable as the `analyzer` of scikit-learn vectorizers, so every consumer shares the same tokens.
+    """
+    key = content_hash(text)
+    tokens = token_cache.get(key)
+    if tokens is None:
+        tokens = preprocess_text(text)
+        token_cache.put(key, tokens)
+    return tokens
+
+
+def _get_process_pool():
+    """
+    Return the process-wide tokenizer pool, started on first use and shut down at exit.
+
+    Workers are started with forkserver (spawn where unavailable), never by forking the
+    multi-threaded server process, which can deadlock on locks held by other threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context(method))
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def preprocess_corpus(texts, chunksize=500):
+    """
+    Preprocess many reports at once and return their token tuples in order.
+
+    Reports already in the cache are not tokenized again; the remaining unique reports are
+    processed in the shared worker process pool when there are enough of them.
+    """
+    texts = list(texts)
+    keys = [content_hash(text) for text in texts]
+    tokens_by_key = {}
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key in tokens_by_key or key in missing:
+            continue
+        tokens = token_cache.get(key)
+        if tokens is None:
+            missing[key] = text
+        else:
+            tokens_by_key[key] = tokens
+
+    if len(missing) >= PARALLEL_THRESHOLD:
+        results = _get_process_pool().map(preprocess_text, missing.values(), chunksize=chunksize)
+        tokens_by_key.update(zip(missing, results))
+    else:
+        tokens_by_key.update((key, preprocess_text(text)) for key, text in missing.items())
+
+    for key in missing:
+        token_cache.put(key, tokens_by_key[key])
+    return [tokens_by_key[key] for key in keys]
+
+
+if __name__ == "__main__":
+    # Test preprocessing and the token cache
+    sample_reports = [
+        "Increased military activity observed near the border",
+        "Cybersecurity threats on the rise in financial sector",
+        "Increased military activity observed near the border",
+    ]
+    for tokens in preprocess_corpus(sample_reports):
+        print(tokens)
+    print("Cached reports:", len(token_cache))
+    corpus = [f"Report {i} on activity near checkpoint {i % 97}" for i in range(PARALLEL_THRESHOLD)]
+    print("Parallel corpus:", len(preprocess_corpus(corpus)), "| pool reused:",
+          _get_process_pool() is _get_process_pool())
@@ -1,6 +1,81 @@
 import plotly.graph_objects as go
 import plotly.express as px
 import networkx as nx
+import numpy as np
+import pandas as pd
+
+def _as_numeric(values):
+    """
+    Convert x values (numbers or datetimes) to a float array for downsampling arithmetic.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values) or values.dtype == object:
+        try:
+            return pd.to_datetime(values).astype('int64').to_numpy(dtype=float)
+        except (TypeError, ValueError):
+            pass
+    return values.to_numpy(dtype=float)
+
+def lttb_indices(x, y, n_out):
+    """
+    Select `n_out` point indices with the Largest-Triangle-Three-Buckets algorithm,
+    which preserves the visual shape of a line chart.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_numeric(x)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket acts as the third triangle vertex
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[selected] - avg_x) * (y[start:end] - y[selected])
+                      - (x[selected] - x[start:end]) * (avg_y - y[selected]))
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+    return indices
+
+def minmax_indices(y, n_buckets):
+    """
+    Keep the minimum and maximum point of each of `n_buckets` buckets, so spikes survive downsampling.
+    """
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    indices = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        indices.extend(sorted({start + int(np.argmin(bucket)), start + int(np.argmax(bucket))}))
+    return np.array(indices)
+
+def downsample_series(x, y, max_points=1000, x_range=None, method='lttb'):
+    """
+    Crop a series to the visible x range and reduce it to at most `max_points` points.
+    Zooming in (a narrower x_range) therefore shows more detail at the same payload size.
+    """
+    x = pd.Series(x).reset_index(drop=True)
+    y = pd.Series(y).reset_index(drop=True)
+    if x_range is not None:
+        visible = (x >= x_range[0]) & (x <= x_range[1])
+        x, y = x[visible].reset_index(drop=True), y[visible].reset_index(drop=True)
+
+    if method == 'minmax':
+        indices = minmax_indices(y, max_points // 2)
+    else:
+        indices = lttb_indices(x, y, max_points)
+    return x.iloc[indices], y.iloc[indices]
 
 def create_source_distribution_chart(source_distribution):
     """
@@ -55,6 +130,46 @@ def create_importance_heatmap(importance_by_region):
     )
     return fig
 
+def create_report_frequency_chart(report_counts, x='date', y='count', max_points=1000, x_range=None):
+    """
+    Create a line chart of report frequency over time, downsampled to at most `max_points` points.
+    """
+    report_counts = report_counts.sort_values(x)
+    x_values, y_values = downsample_series(report_counts[x], report_counts[y], max_points, x_range)
+    # Built from a DataFrame so an empty selection gives an empty chart instead of an error
+    fig = px.line(
+        pd.DataFrame({x: np.asarray(x_values), y: np.asarray(y_values)}),
+        x=x,
+        y=y,
+        labels={x: 'Date', y: 'Count'},
+        title='Report Frequency'
+    )
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
+    return fig
+
+def create_geo_cell_map(cells, bbox=None):
+    """
+    Create a map of aggregated geohash cells, sized by report count and colored by average importance.
+    """
+    fig = px.scatter_geo(
+        cells,
+        lat='latitude',
+        lon='longitude',
+        size='count',
+        color='avg_importance',
+        hover_name='geohash',
+        hover_data={'count': True, 'avg_importance': ':.2f', 'latitude': False, 'longitude': False},
+        color_continuous_scale='Viridis',
+        labels={'avg_importance': 'Avg Importance', 'count': 'Reports'},
+        title='Geolocated Reports by Cell'
+    )
+    if bbox is not None:
+        min_lat, min_lon, max_lat, max_lon = bbox
+        fig.update_geos(lataxis_range=[min_lat, max_lat], lonaxis_range=[min_lon, max_lon])
+    fig.update_geos(showcountries=True)
+    return fig
+
 def create_intelligence_network():
     """
     Create a network graph of intelligence sources and their relationships.
@@ -148,3 +263,12 @@ if __name__ == "__main__":
     create_confidence_radar_chart(sample_confidence_by_source)
     create_importance_heatmap(sample_importance_by_region)
     create_intelligence_network()
+
+    sample_counts = pd.DataFrame({
+        'date': pd.date_range('2023-01-01', periods=100000, freq='min'),
+        'count': np.random.poisson(5, 100000)
+    })
+    fig = create_report_frequency_chart(sample_counts, max_points=500)
+    print("Report frequency points:", len(fig.data[0].x))
+    fig = create_report_frequency_chart(sample_counts.iloc[:0], max_points=500)
+    print("Empty report frequency points:", len(fig.data[0].x) if fig.data else 0)